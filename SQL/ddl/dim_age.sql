@@ -0,0 +1,9 @@
+-- Dim_Age (built by dw_etl/build_dimensions.py)
+IF OBJECT_ID(N'dim.Dim_Age', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Age (
+        age_group VARCHAR(255),
+        age_category VARCHAR(255),
+        age_key INT NOT NULL PRIMARY KEY
+    );
+END;
@@ -0,0 +1,11 @@
+-- Dim_Economic_Classification (built by dw_etl/build_economic_classification_dimension.py)
+IF OBJECT_ID(N'dim.Dim_Economic_Classification', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Economic_Classification (
+        income_group VARCHAR(255),
+        development_status VARCHAR(255),
+        economic_classification_key INT NOT NULL PRIMARY KEY,
+        valid_from_year INT,
+        valid_to_year INT
+    );
+END;
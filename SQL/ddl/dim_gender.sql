@@ -0,0 +1,9 @@
+-- Dim_Gender (loaded from Dim_Sex.csv, built by dw_etl/build_dimensions.py)
+IF OBJECT_ID(N'dim.Dim_Gender', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Gender (
+        gender_code CHAR(1),
+        gender_label VARCHAR(255),
+        gender_key INT NOT NULL PRIMARY KEY
+    );
+END;
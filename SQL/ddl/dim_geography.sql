@@ -0,0 +1,17 @@
+-- Dim_Geography (built by dw_etl/build_geography_dimension.py)
+IF OBJECT_ID(N'dim.Dim_Geography', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Geography (
+        geography_key INT NOT NULL PRIMARY KEY,
+        iso3 VARCHAR(3),
+        country_name VARCHAR(255),
+        continent VARCHAR(255),
+        region VARCHAR(255),
+        income_group VARCHAR(255),
+        population_latest FLOAT,
+        gdp_per_capita FLOAT,
+        is_oecd BIT,
+        is_eu BIT,
+        is_g20 BIT
+    );
+END;
@@ -0,0 +1,14 @@
+-- Dim_Indicator (built by dw_etl/build_indicator_dimension.py)
+IF OBJECT_ID(N'dim.Dim_Indicator', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Indicator (
+        indicator_code VARCHAR(255),
+        indicator_name VARCHAR(255),
+        domain VARCHAR(255),
+        theme VARCHAR(255),
+        category VARCHAR(255),
+        unit VARCHAR(255),
+        source VARCHAR(255),
+        indicator_key INT NOT NULL PRIMARY KEY
+    );
+END;
@@ -0,0 +1,14 @@
+-- Dim_Source (built by dw_etl/build_source_dimension.py)
+IF OBJECT_ID(N'dim.Dim_Source', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Source (
+        source_code VARCHAR(255),
+        full_name VARCHAR(255),
+        organization VARCHAR(255),
+        data_quality_rating VARCHAR(255),
+        update_frequency VARCHAR(255),
+        coverage_start_year INT,
+        coverage_end_year INT,
+        source_key INT NOT NULL PRIMARY KEY
+    );
+END;
@@ -0,0 +1,13 @@
+-- Dim_Time (built by dw_etl/build_time_dimension.py)
+IF OBJECT_ID(N'dim.Dim_Time', 'U') IS NULL
+BEGIN
+    CREATE TABLE dim.Dim_Time (
+        year INT,
+        time_key INT NOT NULL PRIMARY KEY,
+        decade INT,
+        five_year_period INT,
+        is_crisis_year BIT,
+        is_pre_covid BIT,
+        is_post_covid BIT
+    );
+END;
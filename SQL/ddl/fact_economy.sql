@@ -0,0 +1,20 @@
+-- Fact_Economy (built by dw_etl/build_facts.py, ILO sources)
+IF OBJECT_ID(N'fact.Fact_Economy', 'U') IS NULL
+BEGIN
+    CREATE TABLE fact.Fact_Economy (
+        geography_key INT,
+        time_key INT,
+        gender_key INT,
+        age_key INT,
+        economic_classification_key INT,
+        indicator_key INT,
+        value FLOAT,
+        FOREIGN KEY (geography_key) REFERENCES dim.Dim_Geography(geography_key),
+        FOREIGN KEY (time_key) REFERENCES dim.Dim_Time(time_key),
+        FOREIGN KEY (gender_key) REFERENCES dim.Dim_Gender(gender_key),
+        FOREIGN KEY (age_key) REFERENCES dim.Dim_Age(age_key),
+        FOREIGN KEY (economic_classification_key) REFERENCES dim.Dim_Economic_Classification(economic_classification_key),
+        FOREIGN KEY (indicator_key) REFERENCES dim.Dim_Indicator(indicator_key)
+    );
+    CREATE INDEX IX_Fact_Economy_Geography_Time ON fact.Fact_Economy(geography_key, time_key);
+END;
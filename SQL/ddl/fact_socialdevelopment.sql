@@ -0,0 +1,18 @@
+-- Fact_SocialDevelopment (built by dw_etl/build_facts.py)
+IF OBJECT_ID(N'fact.Fact_SocialDevelopment', 'U') IS NULL
+BEGIN
+    CREATE TABLE fact.Fact_SocialDevelopment (
+        geography_key INT,
+        time_key INT,
+        economic_classification_key INT,
+        source_key INT,
+        indicator_key INT,
+        value FLOAT,
+        FOREIGN KEY (geography_key) REFERENCES dim.Dim_Geography(geography_key),
+        FOREIGN KEY (time_key) REFERENCES dim.Dim_Time(time_key),
+        FOREIGN KEY (economic_classification_key) REFERENCES dim.Dim_Economic_Classification(economic_classification_key),
+        FOREIGN KEY (source_key) REFERENCES dim.Dim_Source(source_key),
+        FOREIGN KEY (indicator_key) REFERENCES dim.Dim_Indicator(indicator_key)
+    );
+    CREATE INDEX IX_Fact_SocialDevelopment_Geography_Time ON fact.Fact_SocialDevelopment(geography_key, time_key);
+END;
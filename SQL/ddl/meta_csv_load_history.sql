@@ -0,0 +1,10 @@
+-- meta.csv_load_history: content hash of the CSV each table was last loaded from,
+-- used by the Airflow loader to skip unchanged files
+IF OBJECT_ID(N'meta.csv_load_history', 'U') IS NULL
+BEGIN
+    CREATE TABLE meta.csv_load_history (
+        table_name VARCHAR(255) NOT NULL PRIMARY KEY,
+        content_hash VARCHAR(128) NOT NULL,
+        loaded_at DATETIME2 NOT NULL
+    );
+END;
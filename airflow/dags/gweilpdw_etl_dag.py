@@ -8,11 +8,30 @@ from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 import sys
 import os
-import subprocess
+import hashlib
+import mmap
+import re
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from airflow.hooks.base import BaseHook
 import pyodbc
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Copy-on-Write: column subsets and cleaning steps share buffers until written to
+pd.set_option("mode.copy_on_write", True)
+
+try:
+    import mssql_python  # Native TDS bulk copy; optional, executemany is used without it
+except ImportError:
+    mssql_python = None
+
+try:
+    import xxhash  # Fast CSV content hashing; optional, hashlib is used without it
+except ImportError:
+    xxhash = None
 
 # Default arguments for the DAG
 default_args = {
@@ -33,25 +52,40 @@ dag = DAG(
     schedule_interval='@daily',  # Run daily
     catchup=False,
     tags=['etl', 'datawarehouse', 'gweilpdw'],
-    max_active_runs=1
+    max_active_runs=1,
+    max_active_tasks=8
 )
 
-def run_dw_etl():
-    """Function to run the main ETL process"""
-    print("Starting GWEILPDW ETL process...")
-    
-    # Run the existing ETL script using Python
-    result = subprocess.run([sys.executable, '/opt/airflow/dags/dw_etl/run_all.py'], 
-                           capture_output=True, text=True, cwd='/opt/airflow/dags/dw_etl')
-    
-    if result.returncode == 0:
-        print("ETL process completed successfully!")
-        print("STDOUT:", result.stdout)
-        return result.stdout
-    else:
-        print("ETL process failed!")
-        print("STDERR:", result.stderr)
-        raise RuntimeError(f"ETL process failed with return code {result.returncode}")
+# dw_etl uses flat imports (config, loaders, build_*), so its folder goes on sys.path
+DW_ETL_DIR = "/opt/airflow/dags/dw_etl"
+
+
+def import_run_all():
+    """Import dw_etl/run_all.py in-process (instead of spawning a Python subprocess)"""
+    if DW_ETL_DIR not in sys.path:
+        sys.path.insert(0, DW_ETL_DIR)
+    import run_all
+    return run_all
+
+
+def run_dw_etl_step(step, name=None):
+    """
+    Function to run one step of the ETL process (a function in run_all.py).
+    Parameters are explicit: with **kwargs, PythonOperator would also pass the task context.
+    """
+    kwargs = {'name': name} if name is not None else {}
+    print(f"Running GWEILPDW ETL step {step} {kwargs or ''}")
+    getattr(import_run_all(), step)(**kwargs)
+
+
+def build_geography_and_list_sources():
+    """
+    Build Dim_Geography, then return one op_kwargs dict per source loader so the
+    extraction step is mapped into one parallel task instance per source
+    """
+    run_all = import_run_all()
+    run_all.build_geography()
+    return [{'step': 'extract_source', 'name': name} for name in run_all.SOURCE_LOADERS]
 
 
 def run_profiling():
@@ -62,157 +96,382 @@ def run_profiling():
     print("Data profiling completed!")
 
 
-def get_sql_datatype(dtype):
+# Lower-cased text values that mean "true"/"false" in boolean flag columns
+BIT_VALUES = {
+    "true": 1, "t": 1, "yes": 1, "y": 1, "1": 1, "1.0": 1,
+    "false": 0, "f": 0, "no": 0, "n": 0, "0": 0, "0.0": 0,
+}
+
+# Column-name keywords marking FLOAT measure columns, and the BIT flag columns
+NUMERIC_KEYWORDS = frozenset(['value', 'amount', 'percentage', 'rate', 'ratio', 'index', 'count'])
+BIT_COLUMNS = frozenset(['is_oecd', 'is_eu', 'is_g20'])
+
+# Text placeholders treated as missing values when cleaning dimension columns
+NULL_SENTINELS = frozenset({"", "#N/A", "NULL", "null", "nan", "NaN", "N/A", "NA", "n/a", "none", "None"})
+
+
+def classify_columns(columns):
     """
-    Map pandas data types to SQL Server data types
+    Split a CSV's columns into (numeric, bit, text) lists by name, once per file,
+    so the cleaning passes dispatch on precomputed lists instead of re-testing names.
     """
-    if dtype == 'object':
-        return 'NVARCHAR(MAX)'
-    elif 'int' in str(dtype):
-        return 'BIGINT'
-    elif 'float' in str(dtype):
-        return 'FLOAT'
-    elif 'datetime' in str(dtype):
-        return 'DATETIME2'
-    elif 'bool' in str(dtype):
-        return 'BIT'
-    else:
-        return 'NVARCHAR(255)'  # Default for unknown types
+    numeric_cols, bit_cols, text_cols = [], [], []
+    for col in columns:
+        col_lower = col.lower()
+        if any(k in col_lower for k in NUMERIC_KEYWORDS):
+            numeric_cols.append(col)
+        elif col_lower in BIT_COLUMNS:
+            bit_cols.append(col)
+        else:
+            text_cols.append(col)
+    return numeric_cols, bit_cols, text_cols
+
+
+# Measure columns read straight into Arrow float64 when the CSV is parsed
+MEASURE_KEYWORDS = ('value', 'amount', 'percentage')
+
+# CSVs are streamed in blocks of this many bytes (PyArrow) or rows (pandas fallback),
+# so a load holds one batch in memory rather than the whole file
+CSV_BLOCK_SIZE = 16 << 20
+CSV_FALLBACK_CHUNK_ROWS = 100_000
 
 
-def normalize_float_value(x):
+def read_csv_batches(csv_path, columns, typed=True):
     """
-    Robustly convert any value to a valid SQL float or None.
-    Handles strings, empty values, NaN, inf, and edge cases.
+    Stream the given columns of a CSV as Arrow-backed DataFrames, one block at a time.
+    With typed=True the multithreaded PyArrow reader parses measure columns straight
+    into float64; it raises pyarrow.ArrowInvalid (a ValueError) if a block does not
+    match those types. typed=False falls back to the pandas chunked reader, which
+    infers each chunk separately and coerces the measure columns instead.
     """
-    # Handle None and NaN first
-    if x is None or (isinstance(x, float) and (pd.isna(x) or x != x)):
-        return None
-
-    # Handle empty strings or whitespace-only strings
-    if isinstance(x, str):
-        stripped = x.strip()
-        if stripped == "" or stripped.lower() in ["", "null", "nan", "n/a", "na", "#n/a", "none"]:
-            return None
-        try:
-            val = float(stripped)
-        except (ValueError, TypeError):
-            return None
+    measure_cols = [col for col in columns if any(k in col.lower() for k in MEASURE_KEYWORDS)]
+    if typed:
+        reader = pa_csv.open_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.float64() for col in measure_cols},
+                include_columns=list(columns),  # unlisted columns are never converted
+            ),
+        )
+        for batch in reader:
+            yield batch.to_pandas(types_mapper=pd.ArrowDtype)
     else:
-        try:
-            val = float(x)
-        except (ValueError, TypeError):
-            return None
+        for df in pd.read_csv(csv_path, usecols=list(columns), chunksize=CSV_FALLBACK_CHUNK_ROWS, dtype_backend='pyarrow'):
+            for col in measure_cols:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            yield df
 
-    # Handle special float values
-    if pd.isna(val) or val != val:  # NaN check
-        return None
-    if val == float('inf') or val == float('-inf'):
-        return None
 
-    # Check for precision/scale issues (numbers too large or with too many decimals)
-    # SQL Server FLOAT has limits - be cautious with extremely large numbers
-    if abs(val) > 1e38:
-        print(f"Warning: Value {val} exceeds SQL Server FLOAT limits, converting to None")
-        return None
+_EXHAUSTED = object()
 
-    return val
+
+def prefetch(batches):
+    """
+    Yield the items of an iterator while the next one is produced on a worker thread,
+    so reading and cleaning batch N+1 overlaps with inserting batch N (PyArrow
+    parsing and ODBC round-trips both release the GIL).
+    """
+    iterator = iter(batches)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(next, iterator, _EXHAUSTED)
+        while True:
+            item = future.result()
+            if item is _EXHAUSTED:
+                return
+            future = executor.submit(next, iterator, _EXHAUSTED)
+            yield item
+
+
+def clean_numeric_series(s):
+    """
+    Vectorized conversion of a column to valid SQL Server FLOAT values.
+    Unparseable values, NaN, +/-inf and magnitudes beyond FLOAT limits become None.
+    """
+    numeric = pd.to_numeric(s, errors='coerce')
+    if not pd.api.types.is_numeric_dtype(s):
+        unparseable = numeric.isna() & s.notna() & s.astype('string').str.strip().ne('')
+        if unparseable.any():
+            print(f"  WARNING: Column '{s.name}' has {int(unparseable.sum())} values that couldn't convert to float")
+            print(f"    Examples: {s[unparseable].unique()[:5].tolist()}")
+    too_large = numeric.abs() > 1e38
+    if too_large.any():
+        print(f"Warning: {int(too_large.sum())} values in '{s.name}' exceed SQL Server FLOAT limits, converting to None")
+    numeric = numeric.where(np.isfinite(numeric) & ~too_large)
+    return numeric.astype('object').where(numeric.notna(), None)
+
+
+def normalize_bit_series(s):
+    """
+    Vectorized normalisation of a boolean flag column to 0/1 for BIT columns.
+    Anything that is not a recognisable true/false value becomes None.
+    Text flags are looked up once per distinct value through a category dtype.
+    """
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        bits = s.ne(0).astype('Int8').where(s.notna())
+    else:
+        bits = s.astype('category').map(
+            lambda v: BIT_VALUES.get(str(v).strip().lower()), na_action='ignore'
+        ).astype('Int8')
+    return bits.astype('object').where(bits.notna(), None)
 
 
-def clean_dataframe_strict(df):
+def clean_dataframe_strict(df, columns=None):
     """
     Aggressively clean DataFrame before sending to SQL Server.
     Focuses on identifying and converting problematic columns.
+    Cleans the given columns (default: all) in place and returns the frame.
     """
-    df_cleaned = df.copy()
+    df_cleaned = df
+    numeric_cols, _, text_cols = classify_columns(df_cleaned.columns if columns is None else columns)
+
+    # For numeric columns, apply strict normalization
+    for col in numeric_cols:
+        print(f"Normalizing numeric column: {col}")
+        df_cleaned[col] = clean_numeric_series(df_cleaned[col])
+
+    # For text columns, ensure no invalid empty strings (boolean columns are left as-is)
+    for col in text_cols:
+        # Convert completely empty strings and Arrow nulls to None
+        s = df_cleaned[col]
+        keep = s.notna()
+        if not pd.api.types.is_numeric_dtype(s):
+            keep &= ~s.astype('string').str.strip().eq('').fillna(False)
+        df_cleaned[col] = s.astype('object').where(keep, None)
 
-    for col in df_cleaned.columns:
-        col_lower = col.lower()
+    return df_cleaned
 
-        # For numeric columns, apply strict normalization
-        if any(x in col_lower for x in ['value', 'amount', 'percentage', 'rate', 'ratio', 'index', 'count']):
-            print(f"Normalizing numeric column: {col}")
-            df_cleaned[col] = df_cleaned[col].apply(normalize_float_value)
-            # Convert to nullable float if not already
-            df_cleaned[col] = df_cleaned[col].astype('object')  # Keep as object until insert
-
-        # For text columns, ensure no invalid empty strings
-        elif col_lower not in ['is_oecd', 'is_eu', 'is_g20']:  # Skip boolean columns
-            # Convert completely empty strings to None
-            df_cleaned[col] = df_cleaned[col].apply(
-                lambda x: None if (isinstance(x, str) and x.strip() == "") else x
-            )
 
-    return df_cleaned
+# SQL Server caps a statement at 1000 row constructors and 2100 parameters
+MAX_VALUES_ROWS = 1000
+MAX_STATEMENT_PARAMS = 2100
 
 
-def validate_data_before_insert(df, table_name, schema_name):
+def execute_multirow_values(cursor, insert_sql, data_tuples):
     """
-    Validate data types before attempting insert.
-    Print warnings about suspicious data.
+    Insert rows with multi-row INSERT ... VALUES (...), (...) statements, one
+    round-trip per statement, as the fallback when fast_executemany is not usable.
+    insert_sql is the single-row "INSERT INTO t (cols) VALUES (?, ...)" statement.
     """
-    print(f"\n=== Validating data for {schema_name}.{table_name} ===")
+    prefix, row_placeholders = insert_sql.split(" VALUES ", 1)
+    rows_per_statement = max(1, min(MAX_VALUES_ROWS, (MAX_STATEMENT_PARAMS - 1) // row_placeholders.count('?')))
+    # Only the last group can be short, so at most two statement texts are built;
+    # repeating identical SQL also lets the server reuse the cached plan
+    statements = {}
+    for i in range(0, len(data_tuples), rows_per_statement):
+        rows = data_tuples[i:i + rows_per_statement]
+        values_sql = statements.get(len(rows))
+        if values_sql is None:
+            values_sql = statements[len(rows)] = f"{prefix} VALUES {', '.join([row_placeholders] * len(rows))}"
+        cursor.execute(values_sql, [value for row in rows for value in row])
+
+
+def executemany_with_fallback(cursor, insert_sql, data_tuples, table_name):
+    """
+    Run executemany with fast_executemany enabled, falling back to multi-row
+    VALUES statements if the driver rejects the parameter array (e.g.
+    NVARCHAR(MAX) columns with some ODBC driver versions) or the pyodbc build
+    has no fast_executemany. A savepoint is taken first so a failed attempt
+    leaves no partial rows.
+    """
+    cursor.execute("SAVE TRANSACTION insert_chunk")
+    if not getattr(cursor, 'fast_executemany', False):
+        try:
+            execute_multirow_values(cursor, insert_sql, data_tuples)
+        except pyodbc.Error:
+            cursor.execute("ROLLBACK TRANSACTION insert_chunk")
+            raise
+        return
+
+    try:
+        cursor.executemany(insert_sql, data_tuples)
+    except pyodbc.Error as e:
+        cursor.execute("ROLLBACK TRANSACTION insert_chunk")
+        print(f"fast_executemany failed for {table_name} ({str(e)}), retrying with multi-row VALUES...")
+        cursor.fast_executemany = False
+        try:
+            execute_multirow_values(cursor, insert_sql, data_tuples)
+        except pyodbc.Error:
+            # The rows, not fast_executemany, were the problem
+            cursor.execute("ROLLBACK TRANSACTION insert_chunk")
+            cursor.fast_executemany = True
+            raise
+
+
+# Errors caused by the data in a row (bad value, constraint violation), as opposed to
+# statement, connection or driver failures (ProgrammingError etc.), which still abort the load
+ROW_ERRORS = (pyodbc.DataError, pyodbc.IntegrityError)
+# Past this many rejected rows in one table the load stops isolating them and fails
+MAX_REJECTED_ROWS = 1000
 
+
+def insert_isolating_rejects(cursor, insert_sql, data_tuples, table_name, rejects):
+    """
+    Insert a chunk; if it fails, split it in half and retry each half until the
+    offending rows are isolated (O(log chunk_size) extra round-trips per bad row).
+    Rejected rows are appended to rejects with their error; returns rows inserted.
+    """
+    try:
+        executemany_with_fallback(cursor, insert_sql, data_tuples, table_name)
+        return len(data_tuples)
+    except ROW_ERRORS as e:
+        if len(data_tuples) == 1:
+            rejects.append((data_tuples[0], str(e)))
+            return 0
+    mid = len(data_tuples) // 2
+    return (insert_isolating_rejects(cursor, insert_sql, data_tuples[:mid], table_name, rejects)
+            + insert_isolating_rejects(cursor, insert_sql, data_tuples[mid:], table_name, rejects))
+
+
+def write_rejects(table_name, columns, rejects):
+    """Write rejected rows, with the error that rejected each, to out/_rejects/<schema>.<table>.csv"""
+    REJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    file_stem = table_name.replace('[', '').replace(']', '').removesuffix('__stg')
+    rejects_path = REJECTS_DIR / f"{file_stem}.csv"
+    rejects_df = pd.DataFrame([row for row, _ in rejects], columns=columns)
+    rejects_df["load_error"] = [error for _, error in rejects]
+    rejects_df.to_csv(rejects_path, index=False)
+    print(f"WARNING: {len(rejects)} rows rejected by {table_name}, written to {rejects_path}")
+
+
+def input_sizes_for(df):
+    """
+    Per-column pyodbc type hints for cursor.setinputsizes, taken from the dtypes
+    the CSV was read with (cleaning later turns every column into object), so
+    executemany does not re-infer parameter types for each chunk.
+    Columns without a clear type get None and are still inferred by pyodbc.
+    """
+    numeric_cols, bit_cols, _ = classify_columns(df.columns)
+    sizes = []
     for col in df.columns:
-        col_lower = col.lower()
+        s = df[col]
+        if col in bit_cols:
+            sizes.append((pyodbc.SQL_BIT, 0, 0))
+        elif pd.api.types.is_float_dtype(s) or (col in numeric_cols and pd.api.types.is_numeric_dtype(s)):
+            sizes.append((pyodbc.SQL_DOUBLE, 0, 0))
+        elif pd.api.types.is_integer_dtype(s):
+            sizes.append((pyodbc.SQL_BIGINT, 0, 0))
+        elif pd.api.types.is_string_dtype(s) and s.notna().any():
+            max_len = int(s.astype('string').str.len().max())
+            sizes.append((pyodbc.SQL_WVARCHAR, max(max_len, 1), 0))
+        else:
+            sizes.append(None)
+    return sizes
 
-        # Check for numeric columns
-        if any(x in col_lower for x in ['value', 'amount', 'percentage', 'rate', 'ratio', 'index']):
-            non_null_vals = df[col].dropna()
-            if len(non_null_vals) > 0:
-                try:
-                    # Try to convert all non-null values
-                    numeric_vals = pd.to_numeric(non_null_vals, errors='coerce')
-                    null_count = numeric_vals.isna().sum()
-                    if null_count > 0:
-                        print(f"  WARNING: Column '{col}' has {null_count} values that couldn't convert to float")
-                        # Show examples of problematic values
-                        problem_vals = non_null_vals[numeric_vals.isna()].unique()[:5]
-                        print(f"    Examples: {problem_vals.tolist()}")
-                except Exception as e:
-                    print(f"  ERROR validating column '{col}': {str(e)}")
-
-    print(f"=== Validation complete ===\n")
-
-
-def safe_tuple_convert(row):
-    """
-    Convert row to tuple, ensuring floats are Python float or None.
-    This prevents pyodbc from receiving invalid types.
-    """
-    return tuple(
-        None if (val is None or (isinstance(val, float) and (pd.isna(val) or val != val)))
-        else float(val) if isinstance(val, (int, float)) and not pd.isna(val)
-        else val
-        for val in row
-    )
 
+def bulkcopy_batches(bulk_cnxn, full_table_name, columns, batches):
+    """
+    Stream cleaned DataFrame batches into a table with the TDS bulk copy protocol
+    (the BCP wire format). Columns are mapped by name, the CSVs' precomputed key
+    values are kept even for IDENTITY columns (bcp -E) and NULLs stay NULL
+    instead of picking up column defaults.
+    With mssql-python's bulkcopy_arrow each batch is handed over as Arrow column
+    buffers that the driver core reads directly; older drivers get row tuples.
+    Returns False (after logging) if the bulk load failed, so the caller can
+    fall back to the chunked executemany path.
+    """
+    try:
+        bulk_cursor = bulk_cnxn.cursor()
+        options = dict(
+            batch_size=50000,
+            timeout=0,  # large fact loads routinely outlive the 30s default
+            column_mappings=list(columns),
+            keep_identity=True,
+            keep_nulls=True,
+            table_lock=True,
+        )
+        if hasattr(bulk_cursor, 'bulkcopy_arrow'):
+            # One call per batch: Arrow infers each batch's types on its own (an
+            # all-null column comes out as the null type), so batches need not share a schema
+            rows_copied = 0
+            for df in batches:
+                record_batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+                result = bulk_cursor.bulkcopy_arrow(full_table_name, record_batch, **options)
+                rows_copied += result['rows_copied']
+        else:
+            # Cleaning already left only native Python values and None in every column
+            rows = (row for df in batches for row in df.itertuples(index=False, name=None))
+            rows_copied = bulk_cursor.bulkcopy(full_table_name, rows, **options)['rows_copied']
+        bulk_cnxn.commit()
+        bulk_cursor.close()
+        print(f"Bulk copied {rows_copied} rows into {full_table_name}")
+        return True
+    except Exception as e:
+        print(f"Bulk copy into {full_table_name} failed ({str(e)}), falling back to executemany...")
+        bulk_cnxn.rollback()
+        return False
+
+
+# Output directory where run_all.py writes the CSVs
+OUT_DIR = Path("/opt/airflow/dags/out")
+
+# Rows the server rejected during a load, one CSV per table
+REJECTS_DIR = OUT_DIR / "_rejects"
+
+# Hand-written CREATE TABLE files (repo SQL/ddl, mounted into the Airflow containers)
+DDL_DIR = Path("/opt/airflow/dags/sql/ddl")
+# Table named by a DDL file's IF OBJECT_ID(N'schema.table', 'U') IS NULL guard
+DDL_GUARD_PATTERN = re.compile(r"OBJECT_ID\(N'([^']+)',\s*'U'\)\s+IS\s+NULL", re.IGNORECASE)
+
+# Define CSV files with their target tables based on your exact schema structure
+CSV_MAPPINGS = [
+    # Dimensions (go to 'dim' schema with updated table names to use gender)
+    {"csv": "Dim_Sex.csv", "table": "Dim_Gender", "schema": "dim"},  # CSV still named Dim_Sex but contains gender data, maps to Dim_Gender table
+    {"csv": "Dim_Age.csv", "table": "Dim_Age", "schema": "dim"},
+    {"csv": "Dim_Time.csv", "table": "Dim_Time", "schema": "dim"},
+    {"csv": "Dim_Geography.csv", "table": "Dim_Geography", "schema": "dim"},
+    {"csv": "Dim_Indicator.csv", "table": "Dim_Indicator", "schema": "dim"},
+    {"csv": "Dim_Source.csv", "table": "Dim_Source", "schema": "dim"},
+    {"csv": "Dim_Economic_Classification.csv", "table": "Dim_Economic_Classification", "schema": "dim"},
+    # Facts (go to 'fact' schema with your exact table names)
+    {"csv": "Fact_Economy.csv", "table": "Fact_Economy", "schema": "fact"},
+    {"csv": "Fact_Inequality.csv", "table": "Fact_Inequality", "schema": "fact"},
+    {"csv": "Fact_SocialDevelopment.csv", "table": "Fact_SocialDevelopment", "schema": "fact"},
+]
+
+# Dimensions are independent of each other and load in parallel; facts load in
+# parallel only after every dimension is in place (foreign key constraints)
+DIMENSION_MAPPINGS = [m for m in CSV_MAPPINGS if m["schema"] == "dim"]
+FACT_MAPPINGS = [m for m in CSV_MAPPINGS if m["schema"] == "fact"]
+
+# How staged rows reach the live table, per schema; a mapping may override it
+# with its own "publish" key. 'merge' upserts on the primary key, 'replace'
+# truncates and reloads.
+PUBLISH_STRATEGIES = {"dim": "merge", "fact": "replace"}
+
+
+def clean_dataframe(df, columns=None):
+    """Clean the given columns (default: all) to handle invalid or problematic values (in place)"""
+    df_cleaned = df
+    for col in (df_cleaned.columns if columns is None else columns):
+        s = df_cleaned[col]
+        if isinstance(s.dtype, np.dtype) and s.dtype.kind in 'iub':
+            # Plain NumPy ints/bools can hold neither NA nor sentinels: box only
+            # (the nullable Arrow ones read_csv_batches yields take the masked path below)
+            df_cleaned[col] = s.astype('object')
+            continue
+        null_mask = s.isna()
+        if pd.api.types.is_float_dtype(s):
+            null_mask |= ~np.isfinite(s)
+        elif not pd.api.types.is_numeric_dtype(s):
+            stripped = s.astype('string').str.strip()
+            null_mask |= stripped.isin(NULL_SENTINELS).fillna(False)
+        df_cleaned[col] = s.astype('object').where(~null_mask, None)
+    return df_cleaned
 
-def write_csvs_to_mssql():
-    """Task to write generated CSVs to MSSQL database with proper schema structure"""
-    from airflow.hooks.base import BaseHook
-    import pyodbc
-    from pathlib import Path
-
-    # Helper to clean DataFrames before sending to SQL Server
-    def clean_dataframe(df):
-        """Clean the entire DataFrame to handle invalid or problematic values"""
-        df_cleaned = df.copy()
-        for col in df_cleaned.columns:
-            df_cleaned[col] = df_cleaned[col].apply(
-                lambda x: (
-                    None
-                    if (
-                        pd.isna(x)
-                        or (isinstance(x, float) and (x != x or x == float("inf") or x == float("-inf")))
-                        or (isinstance(x, str) and x.strip() == "")
-                        or x in ["", "#N/A", "NULL", "null", "nan", "NaN", "N/A", "NA"]
-                    )
-                    else x
-                )
-            )
-        return df_cleaned
 
+# Larger TDS packets mean fewer send() calls and TCP segments per insert batch;
+# SQL Server's default is 4096 bytes and its maximum 32767
+SQL_ATTR_PACKET_SIZE = 112
+TDS_PACKET_SIZE = 32767
+
+
+def connect_mssql():
+    """
+    Open the pyodbc connection (with a fast_executemany cursor) and, when
+    mssql-python is installed, a second connection used only for bulk copy.
+    Returns (cnxn, cursor, bulk_cnxn); bulk_cnxn is None when unavailable.
+    """
     # Get the connection info from Airflow
     conn = BaseHook.get_connection('mssql_default')  # The connection ID you created
 
@@ -224,43 +483,85 @@ def write_csvs_to_mssql():
     port = conn.port or 1433
 
     # Create connection string with proper driver
-    drivers_to_try = [
-        "{ODBC Driver 17 for SQL Server}",
-    ]
+    driver = "{ODBC Driver 17 for SQL Server}"
+    connection_string = (
+        f"DRIVER={driver};"
+        f"SERVER={server},{port};"
+        f"DATABASE={database};"
+        f"UID={username};"
+        f"PWD={password};"
+        f"TrustServerCertificate=yes;"
+        f"Connection Timeout=30;"
+        f"Login Timeout=30;"
+        f"Encrypt=no;"
+        f"APP=GWEILPDW_ETL;"
+        f"MARS_Connection=no;"
+    )
+    print(f"Attempting to connect with connection string: DRIVER={driver}, SERVER={server},{port}, DATABASE={database}")
+    # Explicit transactions: each table's rows are committed once, not per chunk.
+    # Packet size is a connection attribute (not a connection string keyword) for
+    # the Microsoft ODBC driver, so it has to be set before connecting
+    cnxn = pyodbc.connect(
+        connection_string,
+        autocommit=False,
+        attrs_before={SQL_ATTR_PACKET_SIZE: TDS_PACKET_SIZE},
+    )
+    print(f"Successfully connected using driver: {driver}")
+    try:
+        packet_size = cnxn.execute(
+            "SELECT net_packet_size FROM sys.dm_exec_connections WHERE session_id = @@SPID"
+        ).fetchval()
+        print(f"Negotiated TDS packet size: {packet_size} bytes")
+    except pyodbc.Error:
+        print("Could not read the negotiated TDS packet size (needs VIEW SERVER STATE)")
+    cnxn.rollback()  # close the implicit transaction the probe opened
+
+    print(f"Attempting to connect to MSSQL server: {server}:{port}")
+    print(f"Database: {database}")
 
-    cnxn = None
-    for driver in drivers_to_try:
+    # Separate mssql-python connection used only for bulk copy, when available
+    bulk_cnxn = None
+    if mssql_python is not None:
         try:
-            connection_string = (
-                f"DRIVER={driver};"
+            bulk_cnxn = mssql_python.connect(
                 f"SERVER={server},{port};"
                 f"DATABASE={database};"
                 f"UID={username};"
                 f"PWD={password};"
                 f"TrustServerCertificate=yes;"
-                f"Connection Timeout=30;"
-                f"Login Timeout=30;"
                 f"Encrypt=no;"
             )
-            print(f"Attempting to connect with connection string: DRIVER={driver}, SERVER={server},{port}, DATABASE={database}")
-            cnxn = pyodbc.connect(connection_string)
-            print(f"Successfully connected using driver: {driver}")
-            break
+            print("Bulk copy connection established via mssql-python")
         except Exception as e:
-            import traceback
-            print(f"Driver {driver} failed with error: {str(e)}")
-            print(f"Full error details:")
-            traceback.print_exc()
-            continue
+            print(f"Could not open mssql-python bulk copy connection ({str(e)}), using executemany only")
 
-    if cnxn is None:
-        raise Exception("Could not connect with any available driver")
+    cursor = cnxn.cursor()
+    # Bind each chunk as a single parameter array instead of one round-trip per row
+    # (pyodbc < 4.0.19 has no fast_executemany; inserts then use multi-row VALUES)
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True
 
-    print(f"Attempting to connect to MSSQL server: {server}:{port}")
-    print(f"Database: {database}")
+    return cnxn, cursor, bulk_cnxn
+
+
+def close_mssql(cnxn, cursor, bulk_cnxn):
+    """Close the connections opened by connect_mssql"""
+    cursor.close()
+    cnxn.close()
+    if bulk_cnxn is not None:
+        bulk_cnxn.close()
 
-    # Create schemas if they don't exist
-    cursor = cnxn.cursor()
+
+def ensure_mssql_schemas():
+    """
+    Task to create the 'dim', 'fact' and 'meta' schemas and every warehouse table before
+    the per-table loads start. Table DDL lives in SQL/ddl (one idempotent
+    IF OBJECT_ID ... CREATE TABLE file per table); dim_*.sql files sort, and so
+    run, before the fact_*.sql files whose foreign keys reference them.
+    Existing tables are read in one round trip up front and files whose table
+    is already present are not sent at all.
+    """
+    cnxn, cursor, bulk_cnxn = connect_mssql()
 
     try:
         # Create dim and fact schemas
@@ -270,421 +571,331 @@ def write_csvs_to_mssql():
         cursor.execute("IF NOT EXISTS (SELECT * FROM sys.schemas WHERE name = 'fact') BEGIN EXEC('CREATE SCHEMA fact') END")
         print("Ensured 'fact' schema exists")
 
+        cursor.execute("IF NOT EXISTS (SELECT * FROM sys.schemas WHERE name = 'meta') BEGIN EXEC('CREATE SCHEMA meta') END")
+        print("Ensured 'meta' schema exists")
+
         cnxn.commit()
     except Exception as e:
         print(f"Error creating schemas: {str(e)}")
         cnxn.rollback()
 
-    # Define the output directory where CSVs are generated
-    out_dir = Path("/opt/airflow/dags/out")
-
-    # Define CSV files with their target tables based on your exact schema structure
-    csv_mappings = [
-        # Dimensions (go to 'dim' schema with updated table names to use gender)
-        {"csv": "Dim_Sex.csv", "table": "Dim_Gender", "schema": "dim"},  # CSV still named Dim_Sex but contains gender data, maps to Dim_Gender table
-        {"csv": "Dim_Age.csv", "table": "Dim_Age", "schema": "dim"},
-        {"csv": "Dim_Time.csv", "table": "Dim_Time", "schema": "dim"},
-        {"csv": "Dim_Geography.csv", "table": "Dim_Geography", "schema": "dim"},
-        {"csv": "Dim_Indicator.csv", "table": "Dim_Indicator", "schema": "dim"},
-        {"csv": "Dim_Source.csv", "table": "Dim_Source", "schema": "dim"},
-        {"csv": "Dim_Economic_Classification.csv", "table": "Dim_Economic_Classification", "schema": "dim"},
-        # Facts (go to 'fact' schema with your exact table names)
-        {"csv": "Fact_Economy.csv", "table": "Fact_Economy", "schema": "fact"},
-        {"csv": "Fact_Inequality.csv", "table": "Fact_Inequality", "schema": "fact"},
-        {"csv": "Fact_SocialDevelopment.csv", "table": "Fact_SocialDevelopment", "schema": "fact"},
-    ]
-
-    # Process CSV files in the correct order: dimensions first, then facts
-    # to avoid foreign key constraint issues during insertion
-    dimension_mappings = [m for m in csv_mappings if m["schema"] == "dim"]
-    fact_mappings = [m for m in csv_mappings if m["schema"] == "fact"]
-
-    # Process dimension tables first
-    for mapping in dimension_mappings:
-        csv_filename = mapping["csv"]
-        table_name = mapping["table"]
-        schema_name = mapping["schema"]
-        full_table_name = f"[{schema_name}].[{table_name}]"
-
-        csv_path = out_dir / csv_filename
-
-        # Check if the file exists before processing
-        if csv_path.exists():
-            print(f"Processing {csv_filename} -> {full_table_name}")
-
-            # Read the CSV
-            df = pd.read_csv(csv_path)
-            # Basic cleaning of missing values before type-specific handling
-            df = df.replace({pd.NA: None})
-            df = df.where(pd.notnull(df), None)
-            df = df.replace('', None)
-
-            # Coerce numeric measure columns (value/amount/percentage) to floats and handle problematic values
-            for col in df.columns:
-                col_lower = col.lower()
-                if 'value' in col_lower or 'amount' in col_lower or 'percentage' in col_lower:
-                    # Convert to numeric, coercing errors to NaN, then convert to Python-native float for SQL
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    # Replace any remaining problematic values (inf, -inf) with None
-                    df[col] = df[col].replace([float('inf'), float('-inf')], None)
-            print(f"Read {len(df)} rows from {csv_filename}")
-
-            # No column name mapping needed since both CSV and table now use gender naming
-            # The CSV contains gender columns and (after schema update) the database table expects gender columns
-
-            # Write to database using pyodbc directly to avoid pandas dialect issues
-            total_rows = len(df)
-            chunk_size = 5000  # Process in chunks to avoid memory issues
-
-            # First, check if the table actually exists in the database/schema using OBJECT_ID
-            check_sql = f"""
-            IF OBJECT_ID(N'{schema_name}.{table_name}', 'U') IS NOT NULL
-                SELECT 1
-            ELSE
-                SELECT 0;
-            """
-            cursor.execute(check_sql)
-            exists_result = cursor.fetchone()
-            table_exists = exists_result[0] == 1 if exists_result else False
-
-            if not table_exists:
-                print(f"Table {full_table_name} does not exist, creating it...")
-
-                # Generate CREATE TABLE statement based on DataFrame dtypes with specific data type mapping for data warehouse
-                columns = list(df.columns)
-                dtypes = df.dtypes
-
-                # Create SQL data type mapping for proper SQL Server types
-                column_definitions = []
-                for col in columns:
-                    dtype_str = str(dtypes[col])
-                    if 'key' in col.lower() or 'id' in col.lower():
-                        # For key fields, use INT with IDENTITY for surrogate keys to avoid duplicates
-                        sql_type = 'INT IDENTITY(1,1) PRIMARY KEY' if 'key' in col.lower() else 'INT'
-                    elif 'code' in col.lower():
-                        sql_type = 'VARCHAR(50)'
-                    elif 'label' in col.lower() or 'name' in col.lower() or 'description' in col.lower():
-                        sql_type = 'VARCHAR(255)'
-                    elif 'flag' in col.lower() or 'indicator' in col.lower():
-                        sql_type = 'BIT'
-                    elif 'amount' in col.lower() or 'value' in col.lower() or 'percentage' in col.lower():
-                        sql_type = 'FLOAT NULL'  # More flexible for various numeric formats
-                    elif 'date' in col.lower() or 'time' in col.lower():
-                        sql_type = 'DATE'
-                    elif 'int' in dtype_str:
-                        sql_type = 'BIGINT'
-                    elif 'float' in dtype_str:
-                        sql_type = 'FLOAT NULL'  # More flexible for any float values
-                    else:
-                        # Default for other types
-                        sql_type = 'VARCHAR(100)'
-
-                    column_definitions.append(f"[{col}] {sql_type}")
-
-                create_sql = f"CREATE TABLE {full_table_name} ({', '.join(column_definitions)})"
-
-                print(f"Executing CREATE TABLE: {create_sql}")
-                cursor.execute(create_sql)
-                cnxn.commit()
-                print(f"Table {full_table_name} created successfully.")
-            else:
-                print(f"Table {full_table_name} exists, replacing data...")
-
-            # For dimension tables, we need to handle foreign key constraints carefully
-            # For fact tables, we can safely delete all data
-            if table_exists:
-                if schema_name == 'fact':
-                    print(f"Deleting from {full_table_name} to clear existing data...")
-                    cursor.execute(f"DELETE FROM {full_table_name}")
-                    cnxn.commit()
-                    print(f"Table {full_table_name} cleared successfully.")
-                elif schema_name == 'dim':
-                    # For dimension tables, we need to handle foreign key constraints carefully
-                    try:
-                        # Try to delete with foreign key constraints disabled temporarily
-                        alter_sql_disable = f"ALTER TABLE {full_table_name} NOCHECK CONSTRAINT ALL"
-                        cursor.execute(alter_sql_disable)
-
-                        cursor.execute(f"DELETE FROM {full_table_name}")
-
-                        # Re-enable constraints
-                        alter_sql_enable = f"ALTER TABLE {full_table_name} CHECK CONSTRAINT ALL"
-                        cursor.execute(alter_sql_enable)
-
-                        cnxn.commit()
-                        print(f"Dimension table {full_table_name} cleared successfully.")
-                    except Exception as e:
-                        print(f"Could not clear dimension table {full_table_name} due to constraints: {str(e)}")
-                        print(f"Skipping deletion for dimension table {full_table_name} to avoid foreign key conflicts.")
-                        # Continue with insert anyway, but skip if already populated to avoid duplicates
-                        cursor.execute(f"SELECT COUNT(1) FROM {full_table_name}")
-                        row_count = cursor.fetchone()[0]
-                        if row_count > 0:
-                            print(f"Dimension table {full_table_name} already has data; skipping to avoid conflicts.")
-                            continue  # Skip this table if it has existing data
+    try:
+        cursor.execute("""
+        SELECT s.name + '.' + t.name
+        FROM sys.tables t JOIN sys.schemas s ON s.schema_id = t.schema_id
+        WHERE s.name IN ('dim', 'fact', 'meta');
+        """)
+        existing_tables = {row[0].lower() for row in cursor.fetchall()}
+        for ddl_path in sorted(DDL_DIR.glob("*.sql")):
+            ddl = ddl_path.read_text()
+            guarded = DDL_GUARD_PATTERN.search(ddl)
+            if guarded and guarded.group(1).lower() in existing_tables:
+                continue
+            cursor.execute(ddl)
+            print(f"Applied {ddl_path.name}")
+        cnxn.commit()
+    except pyodbc.Error as e:
+        print(f"Error creating tables from {DDL_DIR}: {str(e)}")
+        cnxn.rollback()
+        raise
+    finally:
+        close_mssql(cnxn, cursor, bulk_cnxn)
 
-            # Determine which columns to insert.
-            # For this warehouse, the CSVs already contain the correct key values
-            # (e.g. gender_key, geography_key, etc.), and the dimension/fact tables
-            # expect those keys as NOT NULL columns. To keep things consistent with
-            # the existing schema, we insert all CSV columns as-is.
-            columns = list(df.columns)
-            insert_columns = columns
 
-            # Create the INSERT statement
-            placeholders = ', '.join(['?' for _ in insert_columns])
-            insert_sql = f"INSERT INTO {full_table_name} ({', '.join([f'[{col}]' for col in insert_columns])}) VALUES ({placeholders})"
-
-            # Clean the DataFrame
-            df_cleaned = clean_dataframe(df[insert_columns])
-
-            # For geography dimension, normalise boolean flags for BIT columns.
-            # Use string '0'/'1' so SQL Server can safely CAST to BIT without
-            # any ambiguity about float vs integer parameter types.
-            if table_name == "Dim_Geography":
-                def to_bit_str(x):
-                    if x is None or pd.isna(x):
-                        return None
-                    if isinstance(x, bool):
-                        return "1" if x else "0"
-                    if isinstance(x, (int, float)):
-                        return "1" if x != 0 else "0"
-                    if isinstance(x, str):
-                        v = x.strip().lower()
-                        if v in ("true", "t", "yes", "y", "1"):
-                            return "1"
-                        if v in ("false", "f", "no", "n", "0"):
-                            return "0"
-                    return None
-
-                for flag_col in ["is_oecd", "is_eu", "is_g20"]:
-                    if flag_col in df_cleaned.columns:
-                        df_cleaned[flag_col] = df_cleaned[flag_col].apply(to_bit_str)
-
-            # For dimension tables, normalize boolean flag columns to 0/1 for BIT columns
-            if schema_name == 'dim':
-                # Normalize boolean flag columns to 0/1 for BIT columns
-                for col in ["is_oecd", "is_eu", "is_g20"]:
-                    if col in df_cleaned.columns:
-                        def to_bit(x):
-                            if x is None or pd.isna(x):
-                                return None
-                            if isinstance(x, bool):
-                                return 1 if x else 0
-                            if isinstance(x, (int, float)):
-                                return 1 if x != 0 else 0
-                            if isinstance(x, str):
-                                v = x.strip().lower()
-                                if v in ("true", "t", "yes", "y", "1"):
-                                    return 1
-                                if v in ("false", "f", "no", "n", "0"):
-                                    return 0
-                            # Fallback: treat anything else as NULL
-                            return None
-
-                        df_cleaned[col] = df_cleaned[col].apply(to_bit)
-
-            # Insert data in chunks using pyodbc executemany to avoid parameter/size limits
-            print(f"Starting chunked insert of {total_rows} rows into {full_table_name} with chunk size {chunk_size}...")
-            for i in range(0, total_rows, chunk_size):
-                chunk = df_cleaned.iloc[i:i + chunk_size]  # Use cleaned data
-
-                # Use safe conversion instead of direct tuple()
-                data_tuples = [safe_tuple_convert(row) for row in chunk.values]
+def insert_batches(cnxn, cursor, insert_sql, batches, chunk_size, table_name):
+    """
+    Insert (raw, cleaned) DataFrame batches in chunks with pyodbc executemany to
+    avoid parameter/size limits, committing once when every chunk is in.
+    Input sizes are derived from each raw batch, whose dtypes cleaning has not
+    yet flattened to object. Rows the server rejects are set aside and written to
+    the rejects directory at the end; returns how many were rejected. A chunk
+    rejected as a whole, or more than MAX_REJECTED_ROWS rejects, points at a
+    systematic fault rather than bad rows, and fails the load.
+    """
+    total_rows = 0
+    rejects = []
+    columns = None
+    print(f"Starting chunked insert into {table_name} with chunk size {chunk_size}...")
+    try:
+        for raw_df, df_cleaned in batches:
+            columns = list(df_cleaned.columns)
+            cursor.setinputsizes(input_sizes_for(raw_df))
+            # Extract each cleaned column once; per-chunk slices of these arrays are views
+            col_arrays = [df_cleaned[col].to_numpy() for col in columns]
+            for i in range(0, len(df_cleaned), chunk_size):
+                # Cleaned columns hold native Python values and None, so rows go out as-is
+                data_tuples = list(zip(*(arr[i:i + chunk_size] for arr in col_arrays)))
 
                 # Execute the insert for this chunk
-                try:
-                    cursor.executemany(insert_sql, data_tuples)
-                    cnxn.commit()  # Commit after each chunk
-                    print(f"Wrote rows {i + 1} to {min(i + chunk_size, total_rows)} of {total_rows} to {full_table_name}")
-                except pyodbc.ProgrammingError as e:
-                    print(f"ERROR inserting chunk at row {i}: {str(e)}")
-                    # Print first problematic row for debugging
-                    if data_tuples:
-                        print(f"First row in chunk: {data_tuples[0]}")
-                    raise
+                inserted = insert_isolating_rejects(cursor, insert_sql, data_tuples, table_name, rejects)
+                if inserted == 0 and len(data_tuples) > 1:
+                    raise RuntimeError(f"Every row of a {len(data_tuples)}-row chunk was rejected by {table_name}")
+                if len(rejects) > MAX_REJECTED_ROWS:
+                    raise RuntimeError(f"More than {MAX_REJECTED_ROWS} rows rejected by {table_name}")
+                total_rows += inserted
+                print(f"Wrote {total_rows} rows to {table_name}")
+
+        # One commit per table instead of one log flush per chunk
+        cnxn.commit()
+    except Exception:
+        # Never leave a partially inserted table behind in the open transaction
+        cnxn.rollback()
+        raise
+    finally:
+        cursor.setinputsizes(None)
+        if rejects:
+            write_rejects(table_name, columns, rejects)
+    return len(rejects)
+
+
+def csv_content_hash(csv_path):
+    """Hash a CSV's bytes (xxh3 over an mmap when xxhash is installed, blake2b otherwise)"""
+    with open(csv_path, 'rb') as f:
+        if xxhash is None:
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+        if os.fstat(f.fileno()).st_size == 0:
+            return xxhash.xxh3_64(b'').hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return xxhash.xxh3_64(mm).hexdigest()
+
+
+def last_loaded_hash(cursor, full_table_name):
+    """Return the content hash recorded for a table's last successful load, if any"""
+    cursor.execute("SELECT content_hash FROM meta.csv_load_history WHERE table_name = ?", full_table_name)
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def record_loaded_hash(cnxn, cursor, full_table_name, content_hash):
+    """Upsert the content hash of the CSV a table was just loaded from"""
+    cursor.execute("""
+    MERGE meta.csv_load_history WITH (HOLDLOCK) AS t
+    USING (SELECT ? AS table_name, ? AS content_hash) AS s ON t.table_name = s.table_name
+    WHEN MATCHED THEN UPDATE SET t.content_hash = s.content_hash, t.loaded_at = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN INSERT (table_name, content_hash, loaded_at) VALUES (s.table_name, s.content_hash, SYSUTCDATETIME());
+    """, full_table_name, content_hash)
+    cnxn.commit()
+
+
+def create_staging_table(cursor, cnxn, schema_name, table_name):
+    """
+    (Re)create [schema].[table__stg] as an empty heap with the target's columns
+    but none of its constraints or indexes, and return its bracketed name.
+    """
+    staging_table_name = f"[{schema_name}].[{table_name}__stg]"
+    cursor.execute(f"IF OBJECT_ID(N'{schema_name}.{table_name}__stg', 'U') IS NOT NULL DROP TABLE {staging_table_name}")
+    cursor.execute(f"SELECT TOP 0 * INTO {staging_table_name} FROM [{schema_name}].[{table_name}]")
+    cnxn.commit()
+    print(f"Staging table {staging_table_name} ready")
+    return staging_table_name
+
+
+def primary_key_columns(cursor, schema_name, table_name):
+    """Return the primary key column names of a table, in key order"""
+    cursor.execute(f"""
+    SELECT c.name
+    FROM sys.indexes i
+    JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE i.is_primary_key = 1 AND i.object_id = OBJECT_ID(N'{schema_name}.{table_name}')
+    ORDER BY ic.key_ordinal;
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def nonclustered_index_names(cursor, schema_name, table_name):
+    """Return the names of a table's enabled non-clustered, non-key indexes"""
+    cursor.execute(f"""
+    SELECT name
+    FROM sys.indexes
+    WHERE object_id = OBJECT_ID(N'{schema_name}.{table_name}')
+      AND type_desc = 'NONCLUSTERED' AND is_primary_key = 0
+      AND is_unique_constraint = 0 AND is_disabled = 0;
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def orphaned_foreign_keys(cursor, schema_name, table_name, staging_table_name):
+    """
+    Check the staged rows against the live table's enabled foreign keys (the stage
+    has no constraints, so violations would otherwise only surface when publishing
+    fails as a whole). Returns {constraint name: number of orphaned rows}.
+    """
+    cursor.execute(f"""
+    SELECT fk.name, OBJECT_SCHEMA_NAME(fk.referenced_object_id), OBJECT_NAME(fk.referenced_object_id),
+           COL_NAME(fkc.parent_object_id, fkc.parent_column_id),
+           COL_NAME(fkc.referenced_object_id, fkc.referenced_column_id)
+    FROM sys.foreign_keys fk
+    JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+    WHERE fk.parent_object_id = OBJECT_ID(N'{schema_name}.{table_name}') AND fk.is_disabled = 0
+    ORDER BY fk.name, fkc.constraint_column_id;
+    """)
+    foreign_keys = {}
+    for name, ref_schema, ref_table, column, ref_column in cursor.fetchall():
+        foreign_keys.setdefault(name, (f"[{ref_schema}].[{ref_table}]", []))[1].append((column, ref_column))
+
+    orphans = {}
+    for name, (ref_table, pairs) in foreign_keys.items():
+        # Like the constraint itself, rows with a NULL in any key column are not checked
+        not_null = ' AND '.join(f's.[{col}] IS NOT NULL' for col, _ in pairs)
+        match_on = ' AND '.join(f'r.[{ref_col}] = s.[{col}]' for col, ref_col in pairs)
+        cursor.execute(f"SELECT COUNT_BIG(*) FROM {staging_table_name} AS s WHERE {not_null} "
+                       f"AND NOT EXISTS (SELECT 1 FROM {ref_table} AS r WHERE {match_on})")
+        count = cursor.fetchone()[0]
+        if count:
+            orphans[name] = count
+    return orphans
+
+
+def publish_staging_table(cnxn, cursor, schema_name, table_name, columns, strategy):
+    """
+    Move the staged rows into the live table in a single transaction, then drop the stage.
+    'replace' (facts) runs TRUNCATE (deallocation-logged, unlike a row-by-row DELETE)
+    plus INSERT ... WITH (TABLOCK) SELECT, with the non-clustered indexes disabled
+    for the insert and rebuilt afterwards in one sorted pass; foreign keys stay
+    enforced.
+    'merge' (dimensions) upserts on the primary key so rows referenced by facts are
+    updated in place and constraints never need to be disabled; a table
+    without a usable primary key is replaced instead. Unlike the former
+    truncate-and-reload, rows dropped from a dimension CSV are kept on purpose:
+    dimensions publish before the facts are reloaded, so the live facts may still
+    reference them and a WHEN NOT MATCHED BY SOURCE THEN DELETE would violate
+    their foreign keys.
+    """
+    full_table_name = f"[{schema_name}].[{table_name}]"
+    staging_table_name = f"[{schema_name}].[{table_name}__stg]"
+    column_list = ', '.join(f'[{col}]' for col in columns)
+    key_columns = primary_key_columns(cursor, schema_name, table_name) if strategy == 'merge' else []
 
+    try:
+        if key_columns and all(col in columns for col in key_columns):
+            match_on = ' AND '.join(f't.[{col}] = s.[{col}]' for col in key_columns)
+            updates = ', '.join(f't.[{col}] = s.[{col}]' for col in columns if col not in key_columns)
+            merge_sql = f"MERGE {full_table_name} WITH (HOLDLOCK) AS t USING {staging_table_name} AS s ON {match_on} "
+            if updates:
+                merge_sql += f"WHEN MATCHED THEN UPDATE SET {updates} "
+            merge_sql += f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) VALUES ({', '.join(f's.[{col}]' for col in columns)});"
+            cursor.execute(merge_sql)
+            print(f"Merged {staging_table_name} into {full_table_name} on {', '.join(key_columns)}")
         else:
-            print(f"Warning: {csv_filename} not found in {out_dir}")
+            index_names = nonclustered_index_names(cursor, schema_name, table_name)
+            cursor.execute(f"TRUNCATE TABLE {full_table_name}")
+            for index_name in index_names:
+                cursor.execute(f"ALTER INDEX [{index_name}] ON {full_table_name} DISABLE")
+            cursor.execute(f"INSERT INTO {full_table_name} WITH (TABLOCK) ({column_list}) SELECT {column_list} FROM {staging_table_name}")
+            for index_name in index_names:
+                cursor.execute(f"ALTER INDEX [{index_name}] ON {full_table_name} REBUILD")
+            print(f"Replaced contents of {full_table_name} from {staging_table_name}")
+        cursor.execute(f"DROP TABLE {staging_table_name}")
+        cnxn.commit()
+    except pyodbc.Error as e:
+        print(f"Publishing {staging_table_name} into {full_table_name} failed: {str(e)}")
+        cnxn.rollback()
+        raise
 
-    # Then process fact tables (after dimensions are loaded to satisfy foreign key constraints)
-    for mapping in fact_mappings:
+
+def load_table(mapping):
+    """
+    Mapped task: write one CSV to its MSSQL table.
+    Dimensions and facts share this loader and differ only in chunk size,
+    how staged rows are published and which cleaning pass runs.
+    """
+    cnxn, cursor, bulk_cnxn = connect_mssql()
+    try:
         csv_filename = mapping["csv"]
         table_name = mapping["table"]
         schema_name = mapping["schema"]
         full_table_name = f"[{schema_name}].[{table_name}]"
+        is_fact = schema_name == 'fact'
+        publish_strategy = mapping.get("publish", PUBLISH_STRATEGIES[schema_name])
 
-        csv_path = out_dir / csv_filename
+        csv_path = OUT_DIR / csv_filename
 
         # Check if the file exists before processing
         if csv_path.exists():
             print(f"Processing {csv_filename} -> {full_table_name}")
 
-            # Read the CSV
-            df = pd.read_csv(csv_path)
-            # Basic cleaning of missing values before type-specific handling
-            df = df.replace({pd.NA: None})
-            df = df.where(pd.notnull(df), None)
-            df = df.replace('', None)
-
-            # Coerce numeric measure columns (value/amount/percentage) to floats and handle problematic values
-            for col in df.columns:
-                col_lower = col.lower()
-                if 'value' in col_lower or 'amount' in col_lower or 'percentage' in col_lower:
-                    # Convert to numeric, coercing errors to NaN, then convert to Python-native float for SQL
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    # Replace any remaining problematic values (inf, -inf) with None
-                    df[col] = df[col].replace([float('inf'), float('-inf')], None)
-            print(f"Read {len(df)} rows from {csv_filename}")
+            # Skip the whole stage/publish cycle when the CSV is byte-identical to the last load
+            content_hash = csv_content_hash(csv_path)
+            if last_loaded_hash(cursor, full_table_name) == content_hash:
+                print(f"{csv_filename} unchanged since the last load of {full_table_name}; skipping")
+                return
 
             # No column name mapping needed since both CSV and table now use gender naming
             # The CSV contains gender columns and (after schema update) the database table expects gender columns
 
             # Write to database using pyodbc directly to avoid pandas dialect issues
-            total_rows = len(df)
-            chunk_size = 1000  # Process in chunks to avoid memory issues
-
-            # First, check if the table actually exists in the database/schema using OBJECT_ID
-            check_sql = f"""
-            IF OBJECT_ID(N'{schema_name}.{table_name}', 'U') IS NOT NULL
-                SELECT 1
-            ELSE
-                SELECT 0;
-            """
-            cursor.execute(check_sql)
-            exists_result = cursor.fetchone()
-            table_exists = exists_result[0] == 1 if exists_result else False
-
-            if not table_exists:
-                print(f"Table {full_table_name} does not exist, creating it...")
-
-                # Generate CREATE TABLE statement based on DataFrame dtypes with specific data type mapping for data warehouse
-                columns = list(df.columns)
-                dtypes = df.dtypes
-
-                # Create SQL data type mapping for proper SQL Server types
-                column_definitions = []
-                for col in columns:
-                    dtype_str = str(dtypes[col])
-                    if 'key' in col.lower() or 'id' in col.lower():
-                        # For key fields, use INT with IDENTITY for surrogate keys to avoid duplicates
-                        sql_type = 'INT IDENTITY(1,1) PRIMARY KEY' if 'key' in col.lower() else 'INT'
-                    elif 'code' in col.lower():
-                        sql_type = 'VARCHAR(50)'
-                    elif 'label' in col.lower() or 'name' in col.lower() or 'description' in col.lower():
-                        sql_type = 'VARCHAR(255)'
-                    elif 'flag' in col.lower() or 'indicator' in col.lower():
-                        sql_type = 'BIT'
-                    elif 'amount' in col.lower() or 'value' in col.lower() or 'percentage' in col.lower():
-                        sql_type = 'FLOAT NULL'  # More flexible for various numeric formats
-                    elif 'date' in col.lower() or 'time' in col.lower():
-                        sql_type = 'DATE'
-                    elif 'int' in dtype_str:
-                        sql_type = 'BIGINT'
-                    elif 'float' in dtype_str:
-                        sql_type = 'FLOAT NULL'  # More flexible for any float values
-                    else:
-                        # Default for other types
-                        sql_type = 'VARCHAR(100)'
+            chunk_size = 10000 if is_fact else 5000  # Rows per executemany call; larger amortizes each round-trip
 
-                    column_definitions.append(f"[{col}] {sql_type}")
-
-                create_sql = f"CREATE TABLE {full_table_name} ({', '.join(column_definitions)})"
-
-                print(f"Executing CREATE TABLE: {create_sql}")
-                cursor.execute(create_sql)
-                cnxn.commit()
-                print(f"Table {full_table_name} created successfully.")
-            else:
-                print(f"Table {full_table_name} exists, replacing data...")
-
-            # Clear fact tables since they don't have dependencies (they're loaded after dimensions)
-            if table_exists:
-                print(f"Deleting from {full_table_name} to clear existing data...")
-                cursor.execute(f"DELETE FROM {full_table_name}")
-                cnxn.commit()
-                print(f"Table {full_table_name} cleared successfully.")
+            # Tables are created up front by ensure_mssql_schemas from SQL/ddl; rows are
+            # loaded into an empty staging copy and the live table is only touched by
+            # the short publish transaction once every row is staged
+            load_table_name = create_staging_table(cursor, cnxn, schema_name, table_name)
 
             # Determine which columns to insert.
             # For this warehouse, the CSVs already contain the correct key values
             # (e.g. gender_key, geography_key, etc.), and the dimension/fact tables
             # expect those keys as NOT NULL columns. To keep things consistent with
             # the existing schema, we insert all CSV columns as-is.
-            columns = list(df.columns)
+            columns = list(pd.read_csv(csv_path, nrows=0).columns)
             insert_columns = columns
 
             # Create the INSERT statement
             placeholders = ', '.join(['?' for _ in insert_columns])
-            insert_sql = f"INSERT INTO {full_table_name} ({', '.join([f'[{col}]' for col in insert_columns])}) VALUES ({placeholders})"
-
-            # Step 1: Initial cleaning
-            df = df.replace({pd.NA: None})
-            df = df.where(pd.notnull(df), None)
-            df = df.replace('', None)  # Replace empty strings with None
-
-            # Step 2: Aggressive normalization of numeric columns
-            for col in df.columns:
-                col_lower = col.lower()
-                if any(x in col_lower for x in ['value', 'amount', 'percentage', 'rate', 'ratio', 'index', 'count']):
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    df[col] = df[col].replace([float('inf'), float('-inf')], None)
-
-            # Step 3: Validate before insert
-            validate_data_before_insert(df, table_name, schema_name)
-
-            # Step 4: Apply final cleaning
-            df_cleaned = clean_dataframe_strict(df[insert_columns])
-
-            # For dimension tables, normalize boolean flag columns to 0/1 for BIT columns
-            if schema_name == 'dim':
-                # Normalize boolean flag columns to 0/1 for BIT columns
-                for col in ["is_oecd", "is_eu", "is_g20"]:
-                    if col in df_cleaned.columns:
-                        def to_bit(x):
-                            if x is None or pd.isna(x):
-                                return None
-                            if isinstance(x, bool):
-                                return 1 if x else 0
-                            if isinstance(x, (int, float)):
-                                return 1 if x != 0 else 0
-                            if isinstance(x, str):
-                                v = x.strip().lower()
-                                if v in ("true", "t", "yes", "y", "1"):
-                                    return 1
-                                if v in ("false", "f", "no", "n", "0"):
-                                    return 0
-                            # Fallback: treat anything else as NULL
-                            return None
-
-                        df_cleaned[col] = df_cleaned[col].apply(to_bit)
-
-            # Insert data in chunks using pyodbc executemany to avoid parameter/size limits
-            print(f"Starting chunked insert of {total_rows} rows into {full_table_name} with chunk size {chunk_size}...")
-            for i in range(0, total_rows, chunk_size):
-                chunk = df_cleaned.iloc[i:i+chunk_size]  # Use cleaned data
-
-                # Use safe conversion instead of direct tuple()
-                data_tuples = [safe_tuple_convert(row) for row in chunk.values]
-
-                # Execute the insert for this chunk
-                try:
-                    cursor.executemany(insert_sql, data_tuples)
-                    cnxn.commit()  # Commit after each chunk
-                    print(f"Wrote rows {i+1} to {min(i+chunk_size, total_rows)} of {total_rows} to {full_table_name}")
-                except pyodbc.ProgrammingError as e:
-                    print(f"ERROR inserting chunk at row {i}: {str(e)}")
-                    # Print first problematic row for debugging
-                    if data_tuples:
-                        print(f"First row in chunk: {data_tuples[0]}")
-                    raise
+            insert_sql = f"INSERT INTO {load_table_name} ({', '.join([f'[{col}]' for col in insert_columns])}) VALUES ({placeholders})"
+            _, bit_cols, _ = classify_columns(insert_columns)
+
+            def cleaned_batches(typed):
+                """Stream the CSV, cleaning each batch as it is read; yields (raw, cleaned) pairs"""
+                for raw_df in read_csv_batches(csv_path, insert_columns, typed):
+                    # The reader already returns just insert_columns, so no subset copy is taken;
+                    # cleaning replaces columns on a copy-on-write shallow copy, leaving raw_df's
+                    # dtypes intact for input_sizes_for without duplicating any column buffers
+                    df_cleaned = raw_df.copy(deep=False)
+                    # Single cleaning pass: facts get strict numeric coercion/validation, dimensions
+                    # get sentinel removal plus 0/1 normalisation of their BIT flag columns
+                    if is_fact:
+                        clean_dataframe_strict(df_cleaned, insert_columns)
+                    else:
+                        clean_dataframe(df_cleaned, insert_columns)
+                        for col in bit_cols:
+                            df_cleaned[col] = normalize_bit_series(df_cleaned[col])
+                    yield raw_df, df_cleaned
+
+            def stage_rows(typed):
+                # Prefer the native bulk copy path; fall back to chunked executemany on driver errors
+                # Either way the next batch is read and cleaned while the current one is sent
+                if bulk_cnxn is not None and bulkcopy_batches(
+                        bulk_cnxn, load_table_name, insert_columns, (cleaned for _, cleaned in prefetch(cleaned_batches(typed)))):
+                    return 0
+                cursor.execute(f"TRUNCATE TABLE {load_table_name}")  # drop any rows a failed bulk copy left
+                return insert_batches(cnxn, cursor, insert_sql, prefetch(cleaned_batches(typed)), chunk_size, load_table_name)
+
+            try:
+                rejected = stage_rows(typed=True)
+            except ValueError as e:  # pyarrow.ArrowInvalid: a block did not match the parsed column types
+                print(f"Typed read of {csv_filename} failed ({str(e)}), re-reading with per-chunk inference")
+                cnxn.rollback()
+                cursor.setinputsizes(None)
+                cursor.execute(f"TRUNCATE TABLE {load_table_name}")
+                rejected = stage_rows(typed=False)
+
+            # A partial stage must never replace the live table or be recorded as loaded
+            if rejected:
+                raise RuntimeError(f"{rejected} rows of {csv_filename} were rejected (see {REJECTS_DIR}); "
+                                   f"{full_table_name} left unchanged")
+            orphans = orphaned_foreign_keys(cursor, schema_name, table_name, load_table_name)
+            if orphans:
+                raise RuntimeError(f"Staged rows of {csv_filename} violate foreign keys {orphans}; "
+                                   f"{full_table_name} left unchanged")
+
+            publish_staging_table(cnxn, cursor, schema_name, table_name, insert_columns, publish_strategy)
+            record_loaded_hash(cnxn, cursor, full_table_name, content_hash)
 
         else:
-            print(f"Warning: {csv_filename} not found in {out_dir}")
-
-    # Close the connection
-    cursor.close()
-    cnxn.close()
-    print("All CSV files have been written to MSSQL database with proper schema structure successfully!")
+            print(f"Warning: {csv_filename} not found in {OUT_DIR}")
+    finally:
+        close_mssql(cnxn, cursor, bulk_cnxn)
 
 
 # Define tasks
@@ -694,9 +905,37 @@ start_task = BashOperator(
     dag=dag
 )
 
-run_etl_task = PythonOperator(
-    task_id='run_dw_etl',
-    python_callable=run_dw_etl,
+reset_output_task = PythonOperator(
+    task_id='reset_output_dir',
+    python_callable=run_dw_etl_step,
+    op_kwargs={'step': 'reset_output_dir'},
+    dag=dag
+)
+
+build_geography_task = PythonOperator(
+    task_id='build_dim_geography',
+    python_callable=build_geography_and_list_sources,
+    dag=dag
+)
+
+# One task instance per source dataset; independent sources extract in parallel
+extract_sources_task = PythonOperator.partial(
+    task_id='extract_source',
+    python_callable=run_dw_etl_step,
+    dag=dag
+).expand(op_kwargs=build_geography_task.output)
+
+build_dimensions_task = PythonOperator(
+    task_id='build_core_dimensions',
+    python_callable=run_dw_etl_step,
+    op_kwargs={'step': 'build_core_dimensions'},
+    dag=dag
+)
+
+build_facts_task = PythonOperator(
+    task_id='build_facts',
+    python_callable=run_dw_etl_step,
+    op_kwargs={'step': 'build_facts_and_profile'},
     dag=dag
 )
 
@@ -706,12 +945,27 @@ run_profiling_task = PythonOperator(
     dag=dag
 )
 
-write_to_mssql_task = PythonOperator(
-    task_id='write_data_to_mssql',
-    python_callable=write_csvs_to_mssql,
+ensure_schemas_task = PythonOperator(
+    task_id='ensure_mssql_schemas',
+    python_callable=ensure_mssql_schemas,
     dag=dag
 )
 
+# One mapped task instance per table; the mssql_writers pool caps concurrent sessions
+load_dimensions_task = PythonOperator.partial(
+    task_id='load_dimension_table',
+    python_callable=load_table,
+    pool='mssql_writers',
+    dag=dag
+).expand(op_kwargs=[{'mapping': m} for m in DIMENSION_MAPPINGS])
+
+load_facts_task = PythonOperator.partial(
+    task_id='load_fact_table',
+    python_callable=load_table,
+    pool='mssql_writers',
+    dag=dag
+).expand(op_kwargs=[{'mapping': m} for m in FACT_MAPPINGS])
+
 end_task = BashOperator(
     task_id='finish_etl_process',
     bash_command='echo "ETL Pipeline completed successfully!"',
@@ -719,4 +973,7 @@ end_task = BashOperator(
 )
 
 # Set task dependencies
-start_task >> run_etl_task >> run_profiling_task >> write_to_mssql_task >> end_task
+start_task >> [reset_output_task, ensure_schemas_task]
+reset_output_task >> build_geography_task >> [extract_sources_task, build_dimensions_task]
+[extract_sources_task, build_dimensions_task] >> build_facts_task >> run_profiling_task
+[run_profiling_task, ensure_schemas_task] >> load_dimensions_task >> load_facts_task >> end_task
@@ -4,15 +4,22 @@ ETL Step 1–2 (with ETD integration)
 - Atomic facts: Fact_InequalityMeasure, Fact_LabourMarket, Fact_PolicyEconomy
 - Conformed dims (Pays/Temps/Sex/Age/Sector/Indicateur/Unit/Source)
 - Israel excluded, smart ISO3 matching, WB region aggregates
-- Outputs: CSVs + markdown profiling (no SQL)
+- Outputs: Parquet (+ CSV mirrors of the atomic facts) + markdown profiling (no SQL)
 """
 
-import os, re, unicodedata, difflib
+import os, re, unicodedata, difflib, functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 import pandas as pd
 import numpy as np
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # fall back to difflib
+    process = None
+
 # -----------------------------
 # CONFIG
 # -----------------------------
@@ -34,15 +41,27 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 # -----------------------------
 # Helpers
 # -----------------------------
+_RE_PUNCT = re.compile(r"[^\w\s]")
+_RE_WS = re.compile(r"\s+")
+_RE_AGE = re.compile(r"(?:age|years|\d{2}\s*-\s*\d{2}|15-)", re.I)
+
+@functools.lru_cache(maxsize=100_000)
 def fold(s: str) -> str:
     if s is None or (isinstance(s, float) and np.isnan(s)): return ""
     s = str(s).strip().lower()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join([c for c in s if not unicodedata.combining(c)])
-    s = re.sub(r"[^\w\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    if not s.isascii():  # ASCII is already NFKD-normal with no combining marks
+        s = unicodedata.normalize("NFKD", s)
+        s = "".join([c for c in s if not unicodedata.combining(c)])
+    s = _RE_PUNCT.sub(" ", s)
+    s = _RE_WS.sub(" ", s).strip()
     return s
 
+def fold_series(s: pd.Series) -> pd.Series:
+    # fold each distinct value once; pandas' regex str ops run on RE2, whose ASCII-only \w would
+    # drop letters like "ß" that fold keeps, and lookup keys must fold exactly like the names probed
+    uniq = s.dropna().unique()
+    return s.map(dict(zip(uniq, map(fold, uniq)))).fillna("")
+
 ALIASES = {
     "cote d ivoire": "cote d'ivoire","ivory coast":"cote d'ivoire","viet nam":"vietnam",
     "russian federation":"russia","bolivia plurinational state of":"bolivia",
@@ -57,12 +76,12 @@ ALIASES = {
     "cabo verde":"cape verde","holy see":"vatican city","myanmar":"burma",
 }
 
-def is_israel(name: str, iso3: str) -> bool:
-    n = fold(name)
-    # Safely check if iso3 is a non-NA value before comparing it.
-    # This avoids the "boolean value of NA is ambiguous" error.
-    is_iso_match = pd.notna(iso3) and str(iso3).upper() == "ISR"
-    return is_iso_match or ("israel" in n)
+def israel_mask(names: pd.Series, iso3: pd.Series) -> pd.Series:
+    # vectorized is-Israel test: ISO3 == ISR, or "israel" in the accent-folded name
+    iso_match = iso3.astype("string").str.upper().eq("ISR").fillna(False)
+    folded = (names.astype("string").str.lower().str.normalize("NFKD")
+              .str.replace("[\u0300-\u036f]", "", regex=True))
+    return iso_match | folded.str.contains("israel", regex=False).fillna(False)
 
 def profile_df(df: pd.DataFrame, name: str) -> str:
     lines = [f"### {name}", f"- rows: {len(df):,}"]
@@ -82,14 +101,21 @@ def write_report(sections: List[str], path: Path):
         f.write("# Data Profiling Report (Step 1 – with ETD)\n\n")
         for s in sections: f.write(s + "\n\n")
 
+def save(df: pd.DataFrame, path_stem: str, csv_mirror: bool = False):
+    # columnar, typed, zstd-compressed output; csv_mirror keeps a CSV copy for existing consumers
+    df.to_parquet(OUT_DIR / f"{path_stem}.parquet", engine="pyarrow", compression="zstd", index=False)
+    if csv_mirror: df.to_csv(OUT_DIR / f"{path_stem}.csv", index=False)
+
 # -----------------------------
 # Loaders
 # -----------------------------
 def load_ilo_csv(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path, dtype=str)
     keep = ["ref_area.label","source.label","indicator.label","sex.label","classif1.label",
             "time","obs_value","obs_status.label","note_classif.label","note_indicator.label","note_source.label"]
-    df = df[[c for c in keep if c in df.columns]].copy()
+    # header first, so the multithreaded pyarrow parser only materializes the kept columns
+    header = pd.read_csv(path, nrows=0).columns
+    df = pd.read_csv(path, dtype="string[pyarrow]", engine="pyarrow", dtype_backend="pyarrow",
+                     usecols=[c for c in keep if c in header])
     df.rename(columns={
         "ref_area.label":"country_name","source.label":"source","indicator.label":"indicator",
         "sex.label":"sex","classif1.label":"classif1","time":"year","obs_value":"value",
@@ -99,74 +125,122 @@ def load_ilo_csv(path: Path) -> pd.DataFrame:
     if "year" in df.columns:
         df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
     if "value" in df.columns:
-        df["value"] = (df["value"].str.replace(",", "", regex=False).str.replace("\u00a0","",regex=False))
+        # quick downloads are normally plain numerals; only rewrite the column when separators occur
+        if df["value"].str.contains("[,\u00a0]", regex=True).any():
+            df["value"] = df["value"].str.replace("[,\u00a0]", "", regex=True)
         df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    # low-cardinality labels: store as category codes and strip only the distinct labels
+    labels = [c for c in ("sex","classif1","source","indicator","obs_status") if c in df.columns]
     for c in df.columns:
-        if df[c].dtype == object: df[c] = df[c].str.strip()
+        if c not in labels and pd.api.types.is_string_dtype(df[c]): df[c] = df[c].str.strip()
+    for c in labels:
+        cat = df[c].astype("category")
+        stripped = cat.cat.categories.str.strip()
+        # two labels differing only by padding would collide as categories; strip the full column then
+        df[c] = cat.cat.rename_categories(stripped) if stripped.is_unique else df[c].str.strip().astype("category")
     return df
 
 def load_wiid_country(path: Path) -> pd.DataFrame:
     if not path.exists(): return pd.DataFrame()
-    xls = pd.ExcelFile(path)
-    dfs = [pd.read_excel(path, sheet_name=s) for s in xls.sheet_names]
-    wiid = pd.concat(dfs, ignore_index=True)
+    # the parsed workbook is cached next to it as Parquet and reused while newer than the xlsx
+    cache = path.with_suffix(".parquet")
+    if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+        return pd.read_parquet(cache)
+    # one parse for the whole workbook instead of one per sheet
+    wiid = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
     wiid.columns = [str(c).strip().lower() for c in wiid.columns]
+    # name/code/region labels as Arrow-backed strings: smaller than object columns, Arrow kernels for .str ops
+    for c in ("country","c3","region_wb","region_un","region_un_sub","incomegroup"):
+        if c in wiid.columns: wiid[c] = wiid[c].astype("string[pyarrow]")
+    write_parquet_cache(wiid, cache)
     return wiid
 
+def write_parquet_cache(df: pd.DataFrame, cache: Path):
+    # write-then-rename so an interrupted run never leaves a truncated cache that looks fresh
+    tmp = cache.with_name(cache.name + ".tmp")
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, cache)
+    except (OSError, ValueError, TypeError):
+        # mixed-type sheet columns Arrow cannot store, or a read-only directory: just skip the cache
+        tmp.unlink(missing_ok=True)
+
 # -----------------------------
 # Dims
 # -----------------------------
 def build_dim_pays_from_wiid(wiid: pd.DataFrame) -> pd.DataFrame:
     for c in ["country","c3","region_wb","region_un","region_un_sub","incomegroup","population","gdp","year"]:
         if c not in wiid.columns: wiid[c] = np.nan
-    latest = wiid.sort_values(["country","year"], ascending=[True, False]).groupby(["country","c3"], as_index=False).first()
+    # first() takes the latest non-null value per column (a gap in the newest year falls back to older ones),
+    # so keep it rather than drop_duplicates, but only sort and aggregate the columns the dimension uses
+    keep = ["country","c3","region_wb","region_un","region_un_sub","incomegroup","population","gdp","year"]
+    latest = wiid[keep].sort_values(["country","year"], ascending=[True, False]).groupby(["country","c3"], as_index=False).first()
     dim = latest[["country","c3","region_wb","region_un","region_un_sub","incomegroup","population","gdp"]].copy()
     dim.rename(columns={"country":"country_name","c3":"iso3","incomegroup":"income_group",
                         "population":"population_latest","gdp":"gdp_latest"}, inplace=True)
-    dim = dim[~dim.apply(lambda r: is_israel(r.get("country_name",""), r.get("iso3","")), axis=1)]
+    dim = dim[~israel_mask(dim["country_name"], dim["iso3"])]
     dim = dim.dropna(subset=["iso3"]).drop_duplicates("iso3").sort_values("country_name").reset_index(drop=True)
     return dim
 
-def build_country_lookup(dim_pays: pd.DataFrame) -> pd.DataFrame:
-    lk = dim_pays.copy()
-    lk["name_fold"] = lk["country_name"].apply(fold)
-    rows = []
-    for _, r in lk.iterrows():
-        base = re.sub(r"\b(republic|state|islamic|federation|democratic|people s)\b","", r["name_fold"])
-        base = re.sub(r"\s+"," ", base).strip()
-        if base and base != r["name_fold"]:
-            rows.append({"iso3":r["iso3"], "country_name":r["country_name"], "name_fold":base})
-    lk = pd.concat([lk, pd.DataFrame(rows)], ignore_index=True)
-    alias_rows = []
-    for _, r in dim_pays.iterrows():
-        canon = fold(r["country_name"])
-        for k,v in ALIASES.items():
-            if v == canon:
-                alias_rows.append({"iso3":r["iso3"], "country_name":r["country_name"], "name_fold":k})
-    if alias_rows: lk = pd.concat([lk, pd.DataFrame(alias_rows)], ignore_index=True)
-    return lk.drop_duplicates(subset=["name_fold","iso3"])
-
-def smart_match_country(name: str, lookup: pd.DataFrame) -> Tuple[str,str]:
+def build_country_lookup(dim_pays: pd.DataFrame) -> Dict[str, Tuple[str,str]]:
+    lk = dim_pays[["country_name","iso3"]].copy()
+    lk["name_fold"] = fold_series(lk["country_name"])
+    # variants with the government-form words stripped
+    base = (lk["name_fold"].str.replace(r"\b(republic|state|islamic|federation|democratic|people s)\b", "", regex=True)
+            .str.replace(r"\s+", " ", regex=True).str.strip())
+    stripped = lk.assign(name_fold=base)[(base != "") & (base != lk["name_fold"])]
+    # alias spellings, one row per (country, alias)
+    alias_keys = defaultdict(list)
+    for k,v in ALIASES.items(): alias_keys[v].append(k)
+    aliases = lk.assign(name_fold=lk["name_fold"].map(alias_keys)).explode("name_fold").dropna(subset=["name_fold"])
+    lk = pd.concat([lk, stripped, aliases], ignore_index=True)
+    # first row per folded name wins, as the old lookup[...].iloc[0] did
+    lk = lk.drop_duplicates(subset=["name_fold"])
+    return dict(zip(lk["name_fold"], zip(lk["iso3"], lk["country_name"])))
+
+def closest_match(name: str, choices: Iterable[str], cutoff: float):
+    # RapidFuzz's fuzz.ratio is the normalized Indel similarity 2*LCS/(len a + len b) on a 0-100 scale; difflib's
+    # ratio counts Ratcliff/Obershelp matching blocks, never more than the LCS, so RapidFuzz can score a pair
+    # higher and accept some that difflib rejects at the same cutoff
+    if process is not None:
+        best = process.extractOne(name, choices, scorer=fuzz.ratio, score_cutoff=cutoff * 100)
+        return best[0] if best else None
+    best = difflib.get_close_matches(name, choices, n=1, cutoff=cutoff)
+    return best[0] if best else None
+
+def smart_match_country(name: str, lookup: Dict[str, Tuple[str,str]]) -> Tuple[str,str]:
     if not name: return "",""
-    nf = ALIASES.get(fold(name), fold(name))
-    hit = lookup[lookup["name_fold"] == nf]
-    if not hit.empty:
-        row = hit.iloc[0]; return row["iso3"], row["country_name"]
-    choices = lookup["name_fold"].unique().tolist()
-    best = difflib.get_close_matches(nf, choices, n=1, cutoff=0.88)
-    if best:
-        row = lookup[lookup["name_fold"] == best[0]].iloc[0]
-        return row["iso3"], row["country_name"]
+    # exact hits first (lookup keys already include the alias spellings), fuzzy only for the misses
+    nf = fold(name)
+    hit = lookup.get(nf)
+    if hit: return hit
+    nf = ALIASES.get(nf, nf)
+    hit = lookup.get(nf)
+    if hit: return hit
+    best = closest_match(nf, lookup.keys(), 0.88)
+    if best: return lookup[best]
     return "",""
 
+def match_countries(names: pd.Series, lookup: Dict[str, Tuple[str,str]]) -> Tuple[pd.Series, pd.Series]:
+    # resolve each distinct name once, then map back; returns (iso3, canonical name) aligned with names
+    resolved = {nm: smart_match_country(nm, lookup) for nm in names.dropna().unique()}
+    iso3 = names.map(lambda nm: resolved.get(nm, ("",""))[0]).astype("string")
+    canon = names.map(lambda nm: resolved.get(nm, ("",""))[1] or nm).astype("string")
+    return iso3, canon
+
 def build_dims_from_ilo(ilo: Dict[str,pd.DataFrame]) -> Dict[str,pd.DataFrame]:
-    sex_vals, age_vals, sector_vals = set(), set(), set()
-    for _, df in ilo.items():
-        if "sex" in df.columns: sex_vals |= set(df["sex"].dropna().unique().tolist())
-        if "classif1" in df.columns:
-            for v in [str(x) for x in df["classif1"].dropna().unique().tolist()]:
-                if re.search(r"(age|years|\d{2}\s*-\s*\d{2}|15-)", v, re.I): age_vals.add(v)
-                elif fold(v) not in {"","total","all","none"}: sector_vals.add(v)
+    age_vals, sector_vals = set(), set()
+    # one hash pass over the sex labels of all files instead of a set union per file
+    sex = [df["sex"].dropna().astype("string") for df in ilo.values() if "sex" in df.columns]
+    sex_vals = set(pd.concat(sex, ignore_index=True).unique()) if sex else set()
+    # classify the distinct classif1 labels of all files in one vectorized regex pass
+    classif = [df["classif1"].dropna().astype("string") for df in ilo.values() if "classif1" in df.columns]
+    if classif:
+        labels = pd.Series(pd.concat(classif, ignore_index=True).unique(), dtype="string")
+        is_age = labels.str.contains(_RE_AGE.pattern, case=False, regex=True)
+        others = labels[~is_age]
+        age_vals = set(labels[is_age])
+        sector_vals = set(others[~fold_series(others).isin(["","total","all","none"])])
     dim_sex = pd.DataFrame({"sex_key": range(1,len(sex_vals)+1), "sex": sorted(sex_vals)}) if sex_vals else pd.DataFrame(columns=["sex_key","sex"])
     dim_age = pd.DataFrame({"age_key": range(1,len(age_vals)+1), "age_group": sorted(age_vals)}) if age_vals else pd.DataFrame(columns=["age_key","age_group"])
     dim_sector = pd.DataFrame({"sector_key": range(1,len(sector_vals)+1), "sector": sorted(sector_vals)}) if sector_vals else pd.DataFrame(columns=["sector_key","sector"])
@@ -211,43 +285,32 @@ def build_fact_inequality_measure(sub: pd.DataFrame, dim_ind: pd.DataFrame) -> p
                     var_name="indicator_slug", value_name="value").dropna(subset=["value"])
     code_map = {"gini_std":"WIID_gini_std","gini":"WIID_gini","palma":"WIID_palma","s80s20":"WIID_s80s20"}
     melt["indicator_code"] = melt["indicator_slug"].map(code_map)
-    ind_map  = dim_ind.set_index("indicator_code")["indicator_key"].to_dict()
-    unit_map = dim_ind.set_index("indicator_code")["unit_label"].to_dict()
-    src_map  = dim_ind.set_index("indicator_code")["source_key"].to_dict()
-    melt["indicator_key"]  = melt["indicator_code"].map(ind_map)
-    melt["unit_label"]     = melt["indicator_code"].map(unit_map)
-    melt["source_key"]     = melt["indicator_code"].map(src_map)
+    melt = melt.merge(dim_ind[["indicator_code","indicator_key","unit_label","source_key"]],
+                      on="indicator_code", how="left")
     melt["dataset_version"]= "WIID-Comp-2025-04-29"
-    melt = melt[~melt.apply(lambda r: is_israel(r["country_name"], r["iso3"]), axis=1)]
+    melt = melt[~israel_mask(melt["country_name"], melt["iso3"])]
     cols = ["iso3","year","indicator_key","value","country_name","unit_label","source_key","dataset_version"]
     return melt[cols].sort_values(["iso3","year","indicator_key"]).reset_index(drop=True)
 
-def harmonize_ilo_with_dim(ilo_df: pd.DataFrame, lookup: pd.DataFrame, indicator_code: str) -> pd.DataFrame:
+def harmonize_ilo_with_dim(ilo_df: pd.DataFrame, lookup: Dict[str, Tuple[str,str]], indicator_code: str) -> pd.DataFrame:
     df = ilo_df.copy()
-    iso3_list, canon_list = [], []
-    for nm in df["country_name"]:
-        iso3, canon = smart_match_country(nm, lookup)
-        iso3_list.append(iso3)
-        canon_list.append(canon if canon else nm)
-    df["iso3"] = pd.Series(iso3_list, dtype="string")
-    df["country_name"] = pd.Series(canon_list, dtype="string")
-    df = df[~df.apply(lambda r: is_israel(r["country_name"], r.get("iso3","")), axis=1)]
+    df["iso3"], df["country_name"] = match_countries(df["country_name"], lookup)
+    df = df[~israel_mask(df["country_name"], df["iso3"])]
     df["indicator_code"] = indicator_code
     return df
 
 def build_fact_labour_market(ilo: Dict[str,pd.DataFrame], dim_ind: pd.DataFrame, dim_sex: pd.DataFrame, dim_age: pd.DataFrame) -> pd.DataFrame:
     frames = []
+    sex_map = dict(zip(dim_sex["sex"], dim_sex["sex_key"])) if not dim_sex.empty else {}
+    age_map = dict(zip(dim_age["age_group"], dim_age["age_key"])) if not dim_age.empty else {}
     for code, df in ilo.items():
         if df.empty: continue
         tmp = df.copy()
-        tmp["sex_key"] = np.where(tmp.get("sex").notna(),
-                                  tmp["sex"].map({s:k for k,s in zip(dim_sex["sex_key"],dim_sex["sex"])}) if not dim_sex.empty else np.nan,
-                                  np.nan)
-        if "classif1" in tmp.columns and not dim_age.empty:
-            age_map = {g:k for k,g in zip(dim_age["age_key"], dim_age["age_group"])}
-            tmp["age_key"] = tmp["classif1"].map(age_map)
-        else:
-            tmp["age_key"] = np.nan
+        # .map leaves missing/unmapped labels NA; cast since map on a category column returns a category
+        tmp["sex_key"] = (tmp["sex"].map(sex_map).astype("Int64") if "sex" in tmp.columns and sex_map
+                          else pd.Series(pd.NA, index=tmp.index, dtype="Int64"))
+        tmp["age_key"] = (tmp["classif1"].map(age_map).astype("Int64") if "classif1" in tmp.columns and age_map
+                          else pd.Series(pd.NA, index=tmp.index, dtype="Int64"))
 
         row = dim_ind[dim_ind["indicator_code"] == code]
         if row.empty: continue
@@ -259,6 +322,8 @@ def build_fact_labour_market(ilo: Dict[str,pd.DataFrame], dim_ind: pd.DataFrame,
     if not frames:
         return pd.DataFrame(columns=["iso3","year","sex_key","age_key","indicator_key","value","country_name","unit_label","source_key","dataset_version"])
     fact = pd.concat(frames, ignore_index=True)
+    # categorize after concat: frames with differing categories would concat back to object
+    for c in ("unit_label","source_key","dataset_version"): fact[c] = fact[c].astype("category")
     fact["year"]  = pd.to_numeric(fact["year"], errors="coerce").astype("Int64")
     fact["value"] = pd.to_numeric(fact["value"], errors="coerce")
     return fact.dropna(subset=["iso3","year","indicator_key","value"]).reset_index(drop=True)
@@ -274,21 +339,29 @@ def infer_unit_from_name(s: str) -> str:
     return "value"
 
 def normalize_etd_to_long(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path, dtype=str)
-    # standardize columns
-    df.columns = [c.strip() for c in df.columns]
-    lower = {c: c.lower() for c in df.columns}
-    df.rename(columns=lower, inplace=True)
+    # header first: standardized names decide the id columns before the real read
+    header = pd.read_csv(path, nrows=0).columns
+    lower = {c: c.strip().lower() for c in header}
 
     # detect id columns
-    country_col = next((c for c in df.columns if any(k in c for k in ["iso3","country","economy"])), None)
-    year_col    = next((c for c in df.columns if "year" in c or "time" in c), None)
+    country_col = next((c for c in lower.values() if any(k in c for k in ["iso3","country","economy"])), None)
+    year_col    = next((c for c in lower.values() if "year" in c or "time" in c), None)
 
     if not country_col or not year_col:
         # fallback: try 'location' and 'time_period'
         country_col = country_col or "location"
         year_col    = year_col or "time_period"
 
+    # id/label columns (and an already-long value column) stay text, coerced below exactly as before;
+    # the wide indicator columns are left to pyarrow, which parses plain numerals natively
+    text_cols = {country_col, year_col, "indicator", "value"}
+    df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow",
+                     dtype={c: "string[pyarrow]" for c, lc in lower.items() if lc in text_cols})
+    df.rename(columns=lower, inplace=True)
+    # coerce the year once per source row rather than once per melted cell
+    if year_col in df.columns:
+        df[year_col] = pd.to_numeric(df[year_col], errors="coerce").astype("Int64")
+
     # if already long (indicator/value present)
     if {"indicator","value"} <= set(df.columns):
         long_df = df[[country_col, year_col, "indicator", "value"]].copy()
@@ -297,63 +370,64 @@ def normalize_etd_to_long(path: Path) -> pd.DataFrame:
         # assume wide: melt all numeric columns (non id)
         id_cols = [c for c in [country_col, year_col] if c in df.columns]
         value_cols = [c for c in df.columns if c not in id_cols]
-        # keep only numeric-ish columns as indicators
+        # keep only numeric-ish columns as indicators; strip thousands separators only where present
+        numeric_cols = []
         for c in value_cols:
-            df[c] = pd.to_numeric(df[c].str.replace(",","",regex=False), errors="coerce")
-        long_df = df.melt(id_vars=id_cols, value_vars=value_cols, var_name="indicator", value_name="value")
+            col = df[c]
+            if col.dtype.kind not in "iuf":
+                # text the parser could not read as numbers (e.g. "1,234"), or dates/flags that coerce to NaN
+                col = col.astype("string")
+                if col.str.contains(",", regex=False).any():
+                    col = col.str.replace(",","",regex=False)
+            converted = pd.to_numeric(col, errors="coerce")
+            if not converted.notna().any(): continue  # no numeric value at all (label/text or empty column)
+            df[c] = converted
+            numeric_cols.append(c)
+        # rows with no value in any indicator column contribute nothing; drop before the melt multiplies them
+        if numeric_cols: df = df.dropna(subset=numeric_cols, how="all")
+        long_df = (df.melt(id_vars=id_cols, value_vars=numeric_cols, var_name="indicator", value_name="value")
+                     .dropna(subset=["value"]))
         long_df.rename(columns={country_col:"country_raw", year_col:"year"}, inplace=True)
 
-    long_df["year"]  = pd.to_numeric(long_df["year"], errors="coerce").astype("Int64")
     long_df["value"] = pd.to_numeric(long_df["value"], errors="coerce")
     long_df = long_df.dropna(subset=["year","value"])
     return long_df
 
-def build_fact_policyeconomy(etd_long: pd.DataFrame, lookup: pd.DataFrame,
+def build_fact_policyeconomy(etd_long: pd.DataFrame, lookup: Dict[str, Tuple[str,str]],
                               dim_ind: pd.DataFrame, dim_unit: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     # add source row for ETD already present (source_key=3). Extend indicators dynamically.
     dim_ind2 = dim_ind.copy()
     existing_codes = set(dim_ind2["indicator_code"])
 
     # map countries
-    iso3s, names = [], []
-    for nm in etd_long["country_raw"]:
-        iso3, canon = smart_match_country(nm, lookup)
-        iso3s.append(iso3)
-        names.append(canon if canon else nm)
-    etd_long["iso3"] = pd.Series(iso3s, dtype="string")
-    etd_long["country_name"] = pd.Series(names, dtype="string")
-    etd_long = etd_long[~etd_long.apply(lambda r: is_israel(r["country_name"], r.get("iso3","")), axis=1)]
+    etd_long["iso3"], etd_long["country_name"] = match_countries(etd_long["country_raw"], lookup)
+    etd_long = etd_long[~israel_mask(etd_long["country_name"], etd_long["iso3"])]
 
     # create indicator rows if new
     to_add = []
-    for ind in sorted(etd_long["indicator"].dropna().unique().tolist()):
+    base_key = int(dim_ind2["indicator_key"].max()) if len(dim_ind2)>0 else 8
+    for ind in np.sort(pd.unique(etd_long["indicator"].dropna())):
         code = "ETD_" + re.sub(r"[^A-Za-z0-9]+","_", ind).strip("_").upper()
         if code not in existing_codes:
             unit_label = infer_unit_from_name(ind)
-            to_add.append({"indicator_key": dim_ind2["indicator_key"].max()+1 if len(dim_ind2)>0 else 100,
+            # new indicators get consecutive keys after the seeded ones
+            to_add.append({"indicator_key": base_key + len(to_add) + 1,
                            "indicator_name": ind, "indicator_code": code,
                            "unit_label": unit_label, "source_key": 3})
-            # increment subsequent keys
-            if to_add: 
-                for i in range(len(to_add)):
-                    to_add[i]["indicator_key"] = (dim_ind2["indicator_key"].max() if len(dim_ind2)>0 else 8) + i + 1
     if to_add:
         dim_ind2 = pd.concat([dim_ind2, pd.DataFrame(to_add)], ignore_index=True)
 
-    # map to keys
-    map_code_to_key  = dim_ind2.set_index("indicator_name")["indicator_key"].to_dict()
-    map_name_to_unit = dim_ind2.set_index("indicator_name")["unit_label"].to_dict()
-    map_name_to_code = dim_ind2.set_index("indicator_name")["indicator_code"].to_dict()
-
-    fact = etd_long.copy()
-    fact["indicator_key"]  = fact["indicator"].map(map_code_to_key)
-    fact["unit_label"]     = fact["indicator"].map(map_name_to_unit)
-    fact["indicator_code"] = fact["indicator"].map(map_name_to_code)
+    # map to keys (last row wins on a repeated name, as the old dict lookups did)
+    ind_attrs = (dim_ind2[["indicator_name","indicator_key","unit_label","indicator_code"]]
+                 .drop_duplicates("indicator_name", keep="last")
+                 .rename(columns={"indicator_name":"indicator"}))
+    fact = etd_long.merge(ind_attrs, on="indicator", how="left")
     fact["source_key"]     = 3
     fact["dataset_version"]= "ETD-2023-09-18"
 
     fact = fact.dropna(subset=["iso3","indicator_key","value"])
     fact = fact[["iso3","year","indicator_key","value","country_name","unit_label","source_key","dataset_version","indicator_code"]]
+    for c in ("indicator_code","unit_label","dataset_version"): fact[c] = fact[c].astype("category")
     return fact.reset_index(drop=True), dim_ind2
 
 # -----------------------------
@@ -364,25 +438,20 @@ def build_fact_policyeconomy(etd_long: pd.DataFrame, lookup: pd.DataFrame,
 # -----------------------------
 def add_region_wb_to_fact(fact: pd.DataFrame, dim_pays: pd.DataFrame) -> pd.DataFrame:
     if fact.empty: return fact
-    m = fact.merge(dim_pays[["iso3","region_wb","population_latest"]], on="iso3", how="left")
-    
-    def _agg(g):
-        # g no longer contains 'year' or 'indicator_key' due to include_groups=False
-        if g["population_latest"].notna().any():
-            w = g["population_latest"].fillna(0); v = g["value"].fillna(0)
-            denom = w.sum(); val = (v*w).sum()/denom if denom else np.nan
-        else:
-            val = g["value"].mean()
-            
-        # FIX: Only select columns that are NOT used for grouping.
-        # 'unit_label', 'source_key', 'dataset_version' should be constant within a group.
-        row = g.iloc[0][["unit_label","source_key","dataset_version"]] 
-        
-        # The grouping keys ('year', 'indicator_key', 'region_wb') are automatically 
-        # returned by pandas when using as_index=False.
-        return pd.Series({"value": val, **row.to_dict()})
-        
-    out = m.dropna(subset=["region_wb"]).groupby(["region_wb","year","indicator_key"], as_index=False).apply(_agg, include_groups=False).reset_index()
+    # look region/population up per row instead of merging, so only the aggregated columns are materialized
+    dp = dim_pays.drop_duplicates("iso3").set_index("iso3")
+    m = fact[["year","indicator_key","value","unit_label","source_key","dataset_version"]].assign(
+        region_wb=fact["iso3"].map(dp["region_wb"]), population_latest=fact["iso3"].map(dp["population_latest"]))
+    m = m[m["region_wb"].notna()]
+    # population-weighted mean per group as plain sums; groups without any population get the simple mean
+    m["w"] = m["population_latest"].fillna(0.0)
+    m["vw"] = m["value"].fillna(0.0) * m["w"]
+    out = m.groupby(["region_wb","year","indicator_key"], as_index=False).agg(
+        num=("vw","sum"), den=("w","sum"), n_pop=("population_latest","count"), mean_val=("value","mean"),
+        unit_label=("unit_label","first"), source_key=("source_key","first"), dataset_version=("dataset_version","first"))
+    weighted = (out["num"] / out["den"]).where(out["den"] != 0)
+    out.insert(3, "value", weighted.where(out["n_pop"] > 0, out["mean_val"]))
+    out = out.drop(columns=["num","den","n_pop","mean_val"])
     out.rename(columns={"region_wb":"region_wb_label"}, inplace=True)
     return out
 
@@ -396,62 +465,68 @@ def main():
     wiid = load_wiid_country(Path(CONFIG["WIID_COUNTRY_XLSX"]))
     sections.append(profile_df(wiid, f"WIID Country ({CONFIG['WIID_COUNTRY_XLSX']})"))
     dim_pays = build_dim_pays_from_wiid(wiid)
-    dim_pays.to_csv(OUT_DIR / "Dim_Pays_seed.csv", index=False)
+    save(dim_pays, "Dim_Pays_seed")
     sections.append(profile_df(dim_pays, "Dim_Pays_seed (Israel excluded)"))
 
     # lookup
     lookup = build_country_lookup(dim_pays)
 
     # ---- ILO ----
-    ilo_raw, ilo_h = {}, {}
-    for code, fname in CONFIG["ILO_FILES"].items():
-        p = Path(fname)
-        if not p.exists():
-            sections.append(f"### ILO file missing: {code} → {fname}")
-            continue
-        df = load_ilo_csv(p)
-        sections.append(profile_df(df, f"ILO raw: {code}"))
-        df2 = harmonize_ilo_with_dim(df, lookup, code)
-        df2.to_csv(OUT_DIR / f"STAGING_{code}.csv", index=False)
-        ilo_raw[code], ilo_h[code] = df, df2
+    # parse the files concurrently (the CSV parser releases the GIL); harmonize in config order
+    ilo_h = {}
+    present = {code: Path(fname) for code, fname in CONFIG["ILO_FILES"].items() if Path(fname).exists()}
+    with ThreadPoolExecutor(max_workers=max(len(present), 1)) as ex:
+        loading = {code: ex.submit(load_ilo_csv, p) for code, p in present.items()}
+        for code, fname in CONFIG["ILO_FILES"].items():
+            if code not in loading:
+                sections.append(f"### ILO file missing: {code} → {fname}")
+                continue
+            df = loading[code].result()
+            sections.append(profile_df(df, f"ILO raw: {code}"))
+            df2 = harmonize_ilo_with_dim(df, lookup, code)
+            save(df2, f"STAGING_{code}")
+            ilo_h[code] = df2
 
     # ---- Dims small + time ----
     dims_small = build_dims_from_ilo(ilo_h)
     for k,d in dims_small.items():
-        d.to_csv(OUT_DIR / f"{k}.csv", index=False)
+        save(d, k)
         sections.append(profile_df(d, k))
 
-    years = []
-    if "year" in wiid.columns: years += wiid["year"].dropna().astype(int).tolist()
-    for df in ilo_h.values():
-        if "year" in df.columns: years += df["year"].dropna().astype(int).tolist()
-    if years:
-        dim_temps = pd.DataFrame({"year": list(range(min(years), max(years)+1))})
+    # only the overall year span matters: reduce each source to its (min, max)
+    mins, maxs = [], []
+    for df in [wiid, *ilo_h.values()]:
+        if "year" not in df.columns: continue
+        s = df["year"].dropna()
+        if not s.empty:
+            mins.append(int(s.min())); maxs.append(int(s.max()))
+    if mins:
+        dim_temps = pd.DataFrame({"year": np.arange(min(mins), max(maxs)+1, dtype=np.int32)})
         dim_temps["decade"] = (dim_temps["year"] // 10) * 10
-        dim_temps.to_csv(OUT_DIR / "Dim_Temps.csv", index=False)
+        save(dim_temps, "Dim_Temps")
         sections.append(profile_df(dim_temps, "Dim_Temps"))
 
     # ---- Seed dims
     dim_unit, dim_source, dim_ind = dim_units_sources_indicators_seed()
-    dim_unit.to_csv(OUT_DIR / "Dim_Unit.csv", index=False)
-    dim_source.to_csv(OUT_DIR / "Dim_Source.csv", index=False)
+    save(dim_unit, "Dim_Unit")
+    save(dim_source, "Dim_Source")
 
     # ---- WIID facts
     wiid_sub = choose_wiid_subset(wiid)
     sections.append(profile_df(wiid_sub, "WIID subset for inequality"))
     fact_ineq = build_fact_inequality_measure(wiid_sub, dim_ind)
-    fact_ineq.to_csv(OUT_DIR / "Fact_InequalityMeasure.csv", index=False)
+    save(fact_ineq, "Fact_InequalityMeasure", csv_mirror=True)
     sections.append(profile_df(fact_ineq, "Fact_InequalityMeasure"))
     ineq_reg = add_region_wb_to_fact(fact_ineq, dim_pays)
-    ineq_reg.to_csv(OUT_DIR / "Fact_Inequality_RegionWB.csv", index=False)
+    save(ineq_reg, "Fact_Inequality_RegionWB")
     sections.append(profile_df(ineq_reg, "Fact_Inequality_RegionWB (aggregated)"))
 
     # ---- ILO facts
     fact_lab = build_fact_labour_market(ilo_h, dim_ind, dims_small.get("Dim_Sex",pd.DataFrame()), dims_small.get("Dim_Age",pd.DataFrame()))
-    fact_lab.to_csv(OUT_DIR / "Fact_LabourMarket.csv", index=False)
+    save(fact_lab, "Fact_LabourMarket", csv_mirror=True)
     sections.append(profile_df(fact_lab, "Fact_LabourMarket"))
     lab_reg = add_region_wb_to_fact(fact_lab, dim_pays)
-    lab_reg.to_csv(OUT_DIR / "Fact_Labour_RegionWB.csv", index=False)
+    save(lab_reg, "Fact_Labour_RegionWB")
     sections.append(profile_df(lab_reg, "Fact_Labour_RegionWB (aggregated)"))
 
     # ---- ETD → Fact_PolicyEconomy (NEW)
@@ -460,27 +535,29 @@ def main():
         etd_long = normalize_etd_to_long(etd_path)
         sections.append(profile_df(etd_long, f"ETD long staging ({etd_path.name})"))
         fact_etd, dim_ind2 = build_fact_policyeconomy(etd_long, lookup, dim_ind, dim_unit)
-        dim_ind2.to_csv(OUT_DIR / "Dim_Indicateur_seed.csv", index=False)   # include ETD indicators
-        fact_etd.to_csv(OUT_DIR / "Fact_PolicyEconomy.csv", index=False)
+        save(dim_ind2, "Dim_Indicateur_seed")   # include ETD indicators
+        save(fact_etd, "Fact_PolicyEconomy", csv_mirror=True)
         sections.append(profile_df(fact_etd, "Fact_PolicyEconomy"))
         etd_reg = add_region_wb_to_fact(fact_etd, dim_pays)
-        etd_reg.to_csv(OUT_DIR / "Fact_PolicyEconomy_RegionWB.csv", index=False)
+        save(etd_reg, "Fact_PolicyEconomy_RegionWB")
         sections.append(profile_df(etd_reg, "Fact_PolicyEconomy_RegionWB (aggregated)"))
     else:
         # still export baseline indicator seed (no ETD)
-        dim_ind.to_csv(OUT_DIR / "Dim_Indicateur_seed.csv", index=False)
+        save(dim_ind, "Dim_Indicateur_seed")
         sections.append(f"### ETD file missing: {CONFIG['ETD_FILE']}")
 
-    # ---- Unmatched diagnostics from ILO raw
+    # ---- Unmatched diagnostics from the harmonized ILO frames
+    # harmonize already matched every name: misses carry an empty iso3 and keep their raw name;
+    # Israel rows are filtered out there, so Israel labels (excluded by policy) are not listed
     unmatched = []
-    for code, df in ilo_raw.items():
-        names = df["country_name"].dropna().unique().tolist()
-        for nm in names:
-            iso3,_ = smart_match_country(nm, build_country_lookup(dim_pays))
-            if not iso3:
-                cand = difflib.get_close_matches(fold(nm), build_country_lookup(dim_pays)["name_fold"].unique().tolist(), n=1, cutoff=0.75)
-                suggestion = build_country_lookup(dim_pays).query("name_fold == @cand[0]")["country_name"].iloc[0] if cand else ""
-                unmatched.append({"source":code,"country_name":nm,"suggested_match":suggestion})
+    suggestions = {}  # name -> suggested match ("" if none), for names that failed to match
+    choices = list(lookup)
+    for code, df in ilo_h.items():
+        for nm in df.loc[df["iso3"].fillna("") == "", "country_name"].dropna().unique().tolist():
+            if nm not in suggestions:
+                cand = closest_match(fold(nm), choices, 0.75)
+                suggestions[nm] = lookup[cand][1] if cand else ""
+            unmatched.append({"source":code,"country_name":nm,"suggested_match":suggestions[nm]})
     if unmatched:
         pd.DataFrame(unmatched).drop_duplicates().to_csv(OUT_DIR / "UNMATCHED_COUNTRIES_suggestions.csv", index=False)
 
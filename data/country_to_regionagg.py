@@ -1,11 +1,19 @@
+import os
 import re
+import functools
 import unicodedata
 import difflib
+from collections import defaultdict
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, Tuple
 import pandas as pd
 import numpy as np
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # fall back to difflib
+    process = None
+
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
@@ -26,16 +34,26 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 # 1. HELPERS & UTILITIES (Unchanged)
 # -----------------------------
 
+_RE_PUNCT = re.compile(r"[^\w\s]")
+_RE_WS = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=100_000)
 def fold(s: str) -> str:
     """Normalize and simplify strings for matching."""
     if s is None or (isinstance(s, float) and np.isnan(s)): return ""
     s = str(s).strip().lower()
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join([c for c in s if not unicodedata.combining(c)])
-    s = re.sub(r"[^\w\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    if not s.isascii():  # ASCII is already NFKD-normal with no combining marks
+        s = unicodedata.normalize("NFKD", s)
+        s = "".join([c for c in s if not unicodedata.combining(c)])
+    s = _RE_PUNCT.sub(" ", s)
+    s = _RE_WS.sub(" ", s).strip()
     return s
 
+def fold_series(s: pd.Series) -> pd.Series:
+    """fold() over a Series, computed once per distinct value (missing values fold to "")."""
+    uniq = s.dropna().unique()
+    return s.map(dict(zip(uniq, map(fold, uniq)))).fillna("")
+
 ALIASES = {
     "cote d ivoire": "cote d'ivoire","ivory coast":"cote d'ivoire","viet nam":"vietnam",
     "russian federation":"russia","bolivia plurinational state of":"bolivia",
@@ -47,26 +65,46 @@ ALIASES = {
     "united states of america":"united states","eswatini":"swaziland","cabo verde":"cape verde",
 }
 
-def is_israel(name: str, iso3: str) -> bool:
-    """Check if a record corresponds to Israel for exclusion."""
-    n = fold(name)
-    is_iso_match = pd.notna(iso3) and str(iso3).upper() == "ISR"
-    return is_iso_match or ("israel" in n)
+def israel_mask(names: pd.Series, iso3: pd.Series) -> pd.Series:
+    """Vectorized check for records corresponding to Israel (for exclusion)."""
+    iso_match = iso3.astype("string").str.upper().eq("ISR").fillna(False)
+    folded = (names.astype("string").str.lower().str.normalize("NFKD")
+              .str.replace("[\u0300-\u036f]", "", regex=True))
+    return iso_match | folded.str.contains("israel", regex=False).fillna(False)
+
+def closest_match(name: str, choices: Iterable[str], cutoff: float):
+    """Best fuzzy match of name among choices with similarity >= cutoff (0-1), or None.
 
-def smart_match_country(name: str, lookup: pd.DataFrame) -> Tuple[str,str]:
+    RapidFuzz scores the normalized Indel similarity (0-100); difflib's ratio can be lower
+    for the same pair, so difflib accepts a subset of what RapidFuzz does at one cutoff.
+    """
+    if process is not None:
+        best = process.extractOne(name, choices, scorer=fuzz.ratio, score_cutoff=cutoff * 100)
+        return best[0] if best else None
+    best = difflib.get_close_matches(name, choices, n=1, cutoff=cutoff)
+    return best[0] if best else None
+
+def smart_match_country(name: str, lookup: Dict[str, Tuple[str,str]]) -> Tuple[str,str]:
     """Match country name to ISO3 using aliases and fuzzy matching."""
     if not name: return "",""
-    nf = ALIASES.get(fold(name), fold(name))
-    hit = lookup[lookup["name_fold"] == nf]
-    if not hit.empty:
-        row = hit.iloc[0]; return row["iso3"], row["country_name"]
-    choices = lookup["name_fold"].unique().tolist()
-    best = difflib.get_close_matches(nf, choices, n=1, cutoff=0.88)
-    if best:
-        row = lookup[lookup["name_fold"] == best[0]].iloc[0]
-        return row["iso3"], row["country_name"]
+    # exact hits first (lookup keys already include the alias spellings), fuzzy only for the misses
+    nf = fold(name)
+    hit = lookup.get(nf)
+    if hit: return hit
+    nf = ALIASES.get(nf, nf)
+    hit = lookup.get(nf)
+    if hit: return hit
+    best = closest_match(nf, lookup.keys(), 0.88)
+    if best: return lookup[best]
     return "",""
 
+def match_countries(names: pd.Series, lookup: Dict[str, Tuple[str,str]]) -> Tuple[pd.Series, pd.Series]:
+    """Match each distinct name once; returns (iso3, canonical name) aligned with names."""
+    resolved = {nm: smart_match_country(nm, lookup) for nm in names.dropna().unique()}
+    iso3 = names.map(lambda nm: resolved.get(nm, ("",""))[0]).astype("string")
+    canon = names.map(lambda nm: resolved.get(nm, ("",""))[1] or nm).astype("string")
+    return iso3, canon
+
 # -----------------------------
 # 2. DIMENSION BUILDERS
 # -----------------------------
@@ -76,12 +114,28 @@ def load_wiid_country(path: Path) -> pd.DataFrame:
     if not path.exists():
         print(f"Error: WIID region map file not found at {path}")
         return pd.DataFrame()
-    xls = pd.ExcelFile(path)
-    dfs = [pd.read_excel(path, sheet_name=s) for s in xls.sheet_names]
-    wiid = pd.concat(dfs, ignore_index=True)
+    # the parsed workbook is cached next to it as Parquet and reused while newer than the xlsx
+    cache = path.with_suffix(".parquet")
+    if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+        return pd.read_parquet(cache)
+    # one parse for the whole workbook instead of one per sheet
+    wiid = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
     wiid.columns = [str(c).strip().lower() for c in wiid.columns]
+    # Country/ISO3/region labels as Arrow-backed strings (compact, Arrow kernels for .str ops)
+    for c in ("country","c3","region_wb"):
+        if c in wiid.columns: wiid[c] = wiid[c].astype("string[pyarrow]")
+    write_parquet_cache(wiid, cache)
     return wiid
 
+def write_parquet_cache(df: pd.DataFrame, cache: Path):
+    """Write df to cache atomically; skip silently if Arrow or the filesystem refuses it."""
+    tmp = cache.with_name(cache.name + ".tmp")
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, cache)
+    except (OSError, ValueError, TypeError):
+        tmp.unlink(missing_ok=True)
+
 def build_dim_pays_from_wiid(wiid: pd.DataFrame) -> pd.DataFrame:
     """Build the core Country Dimension (Dim_Pays) for mapping and aggregation."""
     # Select latest country info and rename columns
@@ -89,31 +143,31 @@ def build_dim_pays_from_wiid(wiid: pd.DataFrame) -> pd.DataFrame:
     for c in cols:
         if c not in wiid.columns: wiid[c] = np.nan
         
-    latest = wiid.sort_values(["country","year"], ascending=[True, False]).groupby(["country","c3"], as_index=False).first()
+    # groupby.first keeps the latest non-null value per column; restrict it to the columns used here
+    latest = wiid[cols].sort_values(["country","year"], ascending=[True, False]).groupby(["country","c3"], as_index=False).first()
     dim = latest[["country","c3","region_wb","population"]].copy()
     dim.rename(columns={"country":"country_name","c3":"iso3",
                         "population":"population_latest"}, inplace=True)
     
     # Apply exclusions and cleaning
-    dim = dim[~dim.apply(lambda r: is_israel(r.get("country_name",""), r.get("iso3","")), axis=1)]
+    dim = dim[~israel_mask(dim["country_name"], dim["iso3"])]
     dim = dim.dropna(subset=["iso3"]).drop_duplicates("iso3").sort_values("country_name").reset_index(drop=True)
     return dim
 
-def build_country_lookup(dim_pays: pd.DataFrame) -> pd.DataFrame:
+def build_country_lookup(dim_pays: pd.DataFrame) -> Dict[str, Tuple[str,str]]:
     """Build a comprehensive lookup table for country matching (including aliases)."""
     lk = dim_pays[["country_name", "iso3"]].copy()
-    lk["name_fold"] = lk["country_name"].apply(fold)
+    lk["name_fold"] = fold_series(lk["country_name"])
     
-    # Add common aliases for robust matching
-    alias_rows = []
-    for _, r in dim_pays.iterrows():
-        canon = fold(r["country_name"])
-        for k,v in ALIASES.items():
-            if v == canon:
-                alias_rows.append({"iso3":r["iso3"], "country_name":r["country_name"], "name_fold":k})
-    if alias_rows: lk = pd.concat([lk, pd.DataFrame(alias_rows)], ignore_index=True)
+    # Add common aliases for robust matching (one row per country and alias)
+    alias_keys = defaultdict(list)
+    for k,v in ALIASES.items(): alias_keys[v].append(k)
+    aliases = lk.assign(name_fold=lk["name_fold"].map(alias_keys)).explode("name_fold").dropna(subset=["name_fold"])
+    lk = pd.concat([lk, aliases], ignore_index=True)
     
-    return lk.drop_duplicates(subset=["name_fold","iso3"])
+    # first row per folded name wins, as the old lookup[...].iloc[0] did
+    lk = lk.drop_duplicates(subset=["name_fold"])
+    return dict(zip(lk["name_fold"], zip(lk["iso3"], lk["country_name"])))
 
 # -----------------------------
 # 3. ETD FACT BUILDING & CLEANING
@@ -125,48 +179,47 @@ def normalize_etd_to_long(path: Path) -> pd.DataFrame:
         print(f"Error: ETD file not found at {path}")
         return pd.DataFrame()
     
-    df = pd.read_csv(path, dtype=str)
-    df.columns = [c.strip().lower() for c in df.columns]
+    # Probe the header first so only the id columns are forced to text on the real read
+    header = pd.read_csv(path, nrows=0).columns
+    lower = {c: c.strip().lower() for c in header}
 
     # Detect country and year columns (assuming wide format for simplicity)
-    country_col = next((c for c in df.columns if any(k in c for k in ["iso3","country","economy","location"])), None)
-    year_col = next((c for c in df.columns if any(k in c for k in ["year","time","time_period"])), None)
+    country_col = next((c for c in lower.values() if any(k in c for k in ["iso3","country","economy","location"])), None)
+    year_col = next((c for c in lower.values() if any(k in c for k in ["year","time","time_period"])), None)
 
     if not country_col or not year_col:
         print("Error: Could not determine country or year column from ETD file.")
         return pd.DataFrame()
 
+    # Indicator columns are parsed as numbers by the C parser, thousands separators included
+    df = pd.read_csv(path, dtype={c: "string[pyarrow]" for c, lc in lower.items() if lc in (country_col, year_col)},
+                     thousands=",")
+    df.rename(columns=lower, inplace=True)
+
     id_cols = [c for c in [country_col, year_col] if c in df.columns]
     value_cols = [c for c in df.columns if c not in id_cols]
     
-    # Convert value columns to numeric, cleaning the thousands separator
+    # Columns the parser left as text still get cleaned and coerced (non-numeric cells become NaN)
     for c in value_cols:
-        df[c] = pd.to_numeric(df[c].astype(str).str.replace(",","",regex=False), errors="coerce")
+        if df[c].dtype.kind not in "iuf":
+            df[c] = pd.to_numeric(df[c].astype(str).str.replace(",","",regex=False), errors="coerce")
         
+    # Coerce the year once per source row, not once per melted cell; values are all numeric by now
+    df[year_col] = pd.to_numeric(df[year_col], errors="coerce").astype("Int64")
     long_df = df.melt(id_vars=id_cols, value_vars=value_cols, var_name="indicator", value_name="value")
     long_df.rename(columns={country_col:"country_raw", year_col:"year"}, inplace=True)
-
-    long_df["year"] = pd.to_numeric(long_df["year"], errors="coerce").astype("Int64")
-    long_df["value"] = pd.to_numeric(long_df["value"], errors="coerce")
     
     return long_df.dropna(subset=["year","value"]).reset_index(drop=True)
 
 
-def create_etd_fact(etd_long: pd.DataFrame, lookup: pd.DataFrame) -> pd.DataFrame:
+def create_etd_fact(etd_long: pd.DataFrame, lookup: Dict[str, Tuple[str,str]]) -> pd.DataFrame:
     """Harmonize ETD data with ISO3 and canonical names."""
     
-    # 1. Match countries
-    iso3s, names = [], []
-    for nm in etd_long["country_raw"]:
-        iso3, canon = smart_match_country(nm, lookup)
-        iso3s.append(iso3)
-        names.append(canon if canon else nm)
-        
-    etd_long["iso3"] = pd.Series(iso3s, dtype="string")
-    etd_long["country_name"] = pd.Series(names, dtype="string")
+    # 1. Match countries (each distinct raw name is matched once)
+    etd_long["iso3"], etd_long["country_name"] = match_countries(etd_long["country_raw"], lookup)
     
     # 2. Exclude Israel and drop unmatched rows
-    etd_fact = etd_long[~etd_long.apply(lambda r: is_israel(r["country_name"], r.get("iso3","")), axis=1)]
+    etd_fact = etd_long[~israel_mask(etd_long["country_name"], etd_long["iso3"])]
     etd_fact = etd_fact.dropna(subset=["iso3"]).copy()
 
     # 3. Standardize fact columns (minimal set required for aggregation)
@@ -186,32 +239,25 @@ def add_region_wb_to_fact(fact: pd.DataFrame, dim_pays: pd.DataFrame) -> pd.Data
     """Aggregates country-level fact data to World Bank regional level."""
     if fact.empty: return fact
     
-    # Merge country fact data with WB region and population data
-    m = fact.merge(dim_pays[["iso3","region_wb","population_latest"]], on="iso3", how="left")
+    # Look up WB region and population per row (no merge: only the aggregated columns are materialized)
+    dp = dim_pays.drop_duplicates("iso3").set_index("iso3")
+    m = fact[["year","indicator_key","value","unit_label","source_key","dataset_version"]].assign(
+        region_wb=fact["iso3"].map(dp["region_wb"]), population_latest=fact["iso3"].map(dp["population_latest"]))
+    m = m[m["region_wb"].notna()]
     
-    def _agg(g):
-        """Custom aggregation function for GroupBy.apply() - Population-Weighted Average"""
-        # g no longer contains 'year' or 'indicator_key' due to include_groups=False
-        
-        # Check if population data is available for weighted average
-        if g["population_latest"].notna().any():
-            # Population-weighted average (preferred)
-            w = g["population_latest"].fillna(0)
-            v = g["value"].fillna(0)
-            denom = w.sum()
-            val = (v*w).sum()/denom if denom else np.nan
-        else:
-            # Simple mean if no population data available
-            val = g["value"].mean()
-            
-        # Select non-grouping keys (must be constant within the group)
-        row = g.iloc[0][["unit_label","source_key","dataset_version"]] 
-        
-        return pd.Series({"value": val, **row.to_dict()})
-        
-    # Group by Region, Year, and Indicator, applying the custom aggregation
-    out = m.dropna(subset=["region_wb"]).groupby(["region_wb","year","indicator_key"], as_index=False)\
-           .apply(_agg, include_groups=False).reset_index(drop=True)
+    # Population-weighted average (preferred) expressed as plain group sums
+    m["w"] = m["population_latest"].fillna(0.0)
+    m["vw"] = m["value"].fillna(0.0) * m["w"]
+    
+    # Group by Region, Year, and Indicator; non-grouping keys must be constant within a group
+    out = m.groupby(["region_wb","year","indicator_key"], as_index=False).agg(
+        num=("vw","sum"), den=("w","sum"), n_pop=("population_latest","count"), mean_val=("value","mean"),
+        unit_label=("unit_label","first"), source_key=("source_key","first"), dataset_version=("dataset_version","first"))
+    
+    # Simple mean for groups with no population data available
+    weighted = (out["num"] / out["den"]).where(out["den"] != 0)
+    out.insert(3, "value", weighted.where(out["n_pop"] > 0, out["mean_val"]))
+    out = out.drop(columns=["num","den","n_pop","mean_val"])
 
     out.rename(columns={"region_wb":"region_wb_label"}, inplace=True)
     return out
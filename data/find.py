@@ -23,9 +23,17 @@ def load_wiid_regions(path: Path) -> set:
         return set()
     
     try:
-        xls = pd.ExcelFile(path)
-        dfs = [pd.read_excel(path, sheet_name=s) for s in xls.sheet_names]
-        wiid = pd.concat(dfs, ignore_index=True)
+        # reuse the Parquet cache the other WIID loaders leave next to the workbook, if it is fresh
+        cache = path.with_suffix(".parquet")
+        if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+            wiid = pd.read_parquet(cache)
+            if 'region_wb' in wiid.columns:
+                return set(wiid['region_wb'].dropna().unique())
+
+        # one parse for the whole workbook instead of one per sheet; only the region column is materialized
+        wiid = pd.concat(pd.read_excel(path, sheet_name=None,
+                                       usecols=lambda c: str(c).strip().lower() == "region_wb").values(),
+                         ignore_index=True)
         
         # Standardize column names and extract the region column
         wiid.columns = [str(c).strip().lower() for c in wiid.columns]
@@ -65,7 +73,7 @@ def identify_missing_regions():
         return
         
     try:
-        output_df = pd.read_csv(output_path)
+        output_df = pd.read_csv(output_path, usecols=lambda c: c == "region_wb_label")
         
         # The output column is 'region_wb_label' as per your original code
         if 'region_wb_label' not in output_df.columns:
@@ -1,12 +1,18 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
 
 def get_unique_values_chunked(file_path, column_name):
-    unique_values = set()
-    chunk_size = 100000  # Adjust chunk size based on memory constraints
+    # stream record batches with Arrow, reading only the one column; uniques stay Arrow arrays until the end
+    convert_options = pv.ConvertOptions(include_columns=[column_name], column_types={column_name: pa.string()},
+                                        strings_can_be_null=True)  # empty cells are missing, as in pandas
+    parse_options = pv.ParseOptions(invalid_row_handler=lambda row: "skip")  # like on_bad_lines='skip'
     try:
-        for chunk in pd.read_csv(file_path, chunksize=chunk_size, on_bad_lines='skip'):
-            unique_values.update(chunk[column_name].unique())
-        return list(unique_values)
+        uniques = [pc.unique(batch.column(0))
+                   for batch in pv.open_csv(file_path, convert_options=convert_options, parse_options=parse_options)]
+        if not uniques:
+            return []
+        return pc.unique(pa.concat_arrays(uniques)).to_pylist()
     except Exception as e:
         print(f"An error occurred: {e}")
         return None
@@ -1,15 +1,18 @@
 import pandas as pd
 from pathlib import Path
 from config import DATA_DIR, FILES, OUT, EXCLUDE_ISO3
+from utils import read_cached, read_excel_sheets
 
 def load_wiid_global(path: Path) -> pd.DataFrame:
     """Load and combine WIID global sheets."""
     if not path.exists():
         print(f"Error: WIID global file not found at {path}")
         return pd.DataFrame()
-    xls = pd.ExcelFile(path)
-    dfs = [pd.read_excel(path, sheet_name=s) for s in xls.sheet_names]
-    wiid = pd.concat(dfs, ignore_index=True)
+    return read_cached(path, "wiid_global_dim_country", _read_wiid_global)
+
+def _read_wiid_global(path: Path) -> pd.DataFrame:
+    # only the columns build_dim_country uses
+    wiid = read_excel_sheets(path, usecols={"country","c3","population","year"})
     wiid.columns = [str(c).strip().lower() for c in wiid.columns]
     return wiid
 
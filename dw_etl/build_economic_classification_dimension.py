@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from config import OUT
 
@@ -5,25 +6,18 @@ def build_dim_economic_classification(dim_geography: pd.DataFrame):
     """
     Builds the economic classification dimension table.
     """
-    income_groups = dim_geography['income_group'].unique()
-    
-    def get_development_status(income_group):
-        if income_group == 'High income':
-            return 'Developed'
-        elif income_group == 'Low income':
-            return 'LDC'
-        else:
-            return 'Developing'
+    income_groups = dim_geography['income_group'].dropna().drop_duplicates()
 
-    classification_data = []
-    for ig in income_groups:
-        if pd.notna(ig):
-            classification_data.append({
-                'income_group': ig,
-                'development_status': get_development_status(ig)
-            })
+    development_status = np.select(
+        [income_groups.eq('High income'), income_groups.eq('Low income')],
+        ['Developed', 'LDC'],
+        default='Developing',
+    )
 
-    dim_economic_classification = pd.DataFrame(classification_data)
+    dim_economic_classification = pd.DataFrame({
+        'income_group': income_groups.to_numpy(),
+        'development_status': development_status,
+    })
     dim_economic_classification['economic_classification_key'] = dim_economic_classification.index
     
     # Add temporal validity columns (with dummy values for now)
@@ -1,9 +1,26 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from typing import Union
 from config import OUT
 from utils import profile_block
 
 
+def compact_merge_keys(long_df: pd.DataFrame, key_cols: list) -> pd.DataFrame:
+    """
+    Slim a long fact frame before the dimension merges.
+
+    Every merge in the chain copies all left-hand columns, so country_name (never part
+    of a fact) is dropped and the repeated string join keys are stored as categoricals;
+    each key keeps its compact codes through the merges that precede its own lookup.
+    """
+    long_df = long_df.drop(columns=["country_name"], errors="ignore")
+    for c in key_cols:
+        if c in long_df.columns:
+            long_df[c] = long_df[c].astype("category")
+    return long_df
+
+
 def create_economy_fact_table(
     name: str,
     data_sources: list,
@@ -42,56 +59,19 @@ def create_economy_fact_table(
 
     long_df = pd.concat(processed_dfs, ignore_index=True)
     long_df.dropna(subset=["value"], inplace=True)
-
-    # Geography and economic classification (by income group)
-    geo_cols = ["iso3", "geography_key", "income_group"]
-    long_df = pd.merge(
-        long_df,
-        dim_geography[geo_cols],
-        on="iso3",
-        how="left",
-    )
-    long_df = pd.merge(
-        long_df,
-        dim_economic_classification[
-            ["income_group", "economic_classification_key"]
-        ],
-        on="income_group",
-        how="left",
-    )
-
-    # Time
-    long_df = pd.merge(
-        long_df,
-        dim_time[["year", "time_key"]],
-        on="year",
-        how="left",
-    )
-
-    # Indicator
-    long_df = pd.merge(
-        long_df,
-        dim_indicator[["indicator_code", "indicator_key"]],
-        on="indicator_code",
-        how="left",
-    )
-
-    # Gender and age dimensions
-    dim_gender_simplified = dim_sex[["gender_label", "gender_key"]]  # Updated to use new column names
-    long_df = pd.merge(
-        long_df,
-        dim_gender_simplified,
-        left_on="sex",  # Still merging on the "sex" column from the source data
-        right_on="gender_label",  # But now matching to the new gender_label column
-        how="left",
-    )
-
-    dim_age_simplified = dim_age[["age_group", "age_key"]]
-    long_df = pd.merge(
-        long_df,
-        dim_age_simplified,
-        on="age_group",
-        how="left",
+    long_df = compact_merge_keys(long_df, ["iso3", "indicator_code", "sex", "age_group"])
+
+    # Dimension lookups: each dim is indexed once on its natural key and joined on it
+    long_df = (
+        long_df
+        .join(dim_geography.set_index("iso3")[["geography_key", "income_group"]], on="iso3")
+        .join(dim_economic_classification.set_index("income_group")[["economic_classification_key"]], on="income_group")
+        .join(dim_time.set_index("year")[["time_key"]], on="year")
+        .join(dim_indicator.set_index("indicator_code")[["indicator_key"]], on="indicator_code")
+        # source data carries "sex"; Dim_Gender labels it gender_label
+        .join(dim_sex.set_index("gender_label")[["gender_key"]], on="sex")
+        .join(dim_age.set_index("age_group")[["age_key"]], on="age_group")
+        .reset_index(drop=True)
     )
 
     fact_table = long_df[
@@ -143,57 +123,31 @@ def create_fact_table(
         if not id_vars:
             continue
 
+        # country_name is not part of any fact: leave it out rather than repeat it per indicator,
+        # and drop empty cells per source so the concat only copies real observations
         melted_df = df.melt(
-            id_vars=id_vars,
+            id_vars=[c for c in id_vars if c != "country_name"],
+            value_vars=[c for c in df.columns if c not in id_vars],
             var_name="indicator_code",
             value_name="value",
-        )
+        ).dropna(subset=["value"])
         all_long_dfs.append(melted_df)
 
     if not all_long_dfs:
         return None
 
     long_df = pd.concat(all_long_dfs, ignore_index=True)
-    long_df.dropna(subset=["value"], inplace=True)
-
-    # Geography (incl. income group) and economic classification
-    geo_cols = ["iso3", "geography_key", "income_group"]
-    long_df = pd.merge(
-        long_df,
-        dim_geography[geo_cols],
-        on="iso3",
-        how="left",
-    )
-    long_df = pd.merge(
-        long_df,
-        dim_economic_classification[
-            ["income_group", "economic_classification_key"]
-        ],
-        on="income_group",
-        how="left",
-    )
-
-    # Time
-    long_df = pd.merge(
-        long_df,
-        dim_time[["year", "time_key"]],
-        on="year",
-        how="left",
-    )
-
-    # Indicator, source
-    long_df = pd.merge(
-        long_df,
-        dim_indicator[["indicator_code", "indicator_key", "unit", "source"]],
-        on="indicator_code",
-        how="left",
-    )
-    long_df = pd.merge(
-        long_df,
-        dim_source[["source_code", "source_key"]],
-        left_on="source",
-        right_on="source_code",
-        how="left",
+    long_df = compact_merge_keys(long_df, ["iso3", "indicator_code"])
+
+    # Dimension lookups: each dim is indexed once on its natural key and joined on it
+    long_df = (
+        long_df
+        .join(dim_geography.set_index("iso3")[["geography_key", "income_group"]], on="iso3")
+        .join(dim_economic_classification.set_index("income_group")[["economic_classification_key"]], on="income_group")
+        .join(dim_time.set_index("year")[["time_key"]], on="year")
+        .join(dim_indicator.set_index("indicator_code")[["indicator_key", "unit", "source"]], on="indicator_code")
+        .join(dim_source.set_index("source_code")[["source_key"]], on="source")
+        .reset_index(drop=True)
     )
 
     # For these facts, sex/age are not meaningful – keep schema lean
@@ -213,8 +167,23 @@ def create_fact_table(
 
 
 def write_fact(path, df, name: str) -> str:
-    """Write a fact table to CSV and return its profile block."""
-    df.to_csv(path, index=False)
+    """
+    Write a fact table and return its profile block.
+
+    A .parquet path is written as zstd-compressed Parquet; anything else goes through
+    PyArrow's multithreaded CSV writer, with pandas' writer kept for frames Arrow cannot
+    convert (e.g. an object column mixing numbers and text). Arrow quotes the header and
+    any text cells, and writes whole floats without a decimal part (0, not 0.0).
+    """
+    if str(path).endswith(".parquet"):
+        df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df.to_csv(path, index=False)
+        else:
+            pa_csv.write_csv(table, path, write_options=pa_csv.WriteOptions(quoting_style="needed"))
     print(f"Fact '{name}' built with {len(df)} records.")
     return profile_block(df, name)
 
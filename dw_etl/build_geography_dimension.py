@@ -1,5 +1,16 @@
 import pandas as pd
 from config import DATA_DIR, OUT, EXCLUDE_ISO3
+from utils import read_cached
+
+WIID_COLUMNS = {"country", "c3", "region_un", "region_un_sub", "incomegroup", "population", "gdp", "year"}
+
+
+def _read_wiid_country(path):
+    """Read only the WIID columns Dim_Geography uses, with normalized lower-case names."""
+    wiid = pd.read_csv(path, usecols=lambda c: str(c).strip().lower() in WIID_COLUMNS)
+    wiid.columns = [str(c).strip().lower() for c in wiid.columns]
+    return wiid
+
 
 def build_dim_geography():
     """Builds the conformed geography dimension from the WIID Global CSV file."""
@@ -8,10 +19,11 @@ def build_dim_geography():
         print(f"Error: WIID global CSV file not found at {wiid_path}")
         return pd.DataFrame()
 
-    wiid = pd.read_csv(wiid_path)
-    wiid.columns = [str(c).strip().lower() for c in wiid.columns]
+    wiid = read_cached(wiid_path, "wiidcountry_4_geography", _read_wiid_country)
 
-    # Select latest country info (one row per country, most recent year)
+    # Select latest country info (one row per country, most recent year).
+    # groupby.first takes the newest non-null value per column, so a gap in the latest
+    # year falls back to older years; drop_duplicates would keep the gap.
     latest = (
         wiid
         .sort_values(["country", "year"], ascending=[True, False])
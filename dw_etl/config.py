@@ -5,6 +5,9 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 OUT_DIR  = PROJECT_ROOT / "out"
 OUT_DIR.mkdir(exist_ok=True)
+# Parquet copies of parsed source files (see utils.read_cached); kept out of OUT_DIR,
+# which reset_output_dir wipes at the start of every run
+CACHE_DIR = DATA_DIR / ".cache"
 
 # Policy choices
 EXCLUDE_ISO3 = {"ISR"}
@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from config import DATA_DIR, FILES
-from utils import exclude_israel
+from utils import exclude_israel, read_excel_sheets
 
 def load_wiid_country() -> pd.DataFrame:
     """
@@ -9,9 +9,7 @@ def load_wiid_country() -> pd.DataFrame:
     with specific columns for each inequality measure.
     """
     xlsx_name = FILES["WIID_COUNTRY_XLSX"]
-    xls = pd.ExcelFile(DATA_DIR / xlsx_name)
-    frames = [pd.read_excel(DATA_DIR / xlsx_name, sheet_name=s) for s in xls.sheet_names]
-    wiid = pd.concat(frames, ignore_index=True)
+    wiid = read_excel_sheets(DATA_DIR / xlsx_name)
     wiid.columns = [str(c).strip().lower() for c in wiid.columns]
 
     for c in ["country","c3","year","giniseries","shareseries","gini_std","gini","palma","s80s20"]:
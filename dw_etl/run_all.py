@@ -2,6 +2,8 @@ import shutil
 import time
 from pathlib import Path
 
+import pandas as pd
+
 from config import FILES, OUT, OUT_DIR
 from loaders.wiid import load_wiid_country
 from loaders.ilostat import load_ilostat_quick, load_ilostat_minimum_wage
@@ -31,123 +33,137 @@ ILO_MEASURE_MAP = {
 }
 
 
-def main() -> None:
-    """Orchestrate the entire ETL process for the warehouse."""
-    print("--- Starting GWEILPDW ETL ---")
+# Intermediate DataFrames handed from one step to the next (Airflow runs each
+# step as its own task, so they cannot simply be passed in memory)
+STAGE_DIR = OUT_DIR / "_stage"
 
-    # === Cleanup ===
-    if OUT_DIR.exists():
-        print(f"--- Deleting existing output directory: {OUT_DIR} ---")
-        time.sleep(2)  # Allow time for file locks to be released
-        shutil.rmtree(OUT_DIR)
-    OUT_DIR.mkdir(exist_ok=True)
 
-    # === Dimensions that depend only on raw data ===
-    print("\n--- Building Geography Dimension ---")
-    dim_geography = build_dim_geography()
+def _stage(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Persist an intermediate DataFrame for a later step."""
+    STAGE_DIR.mkdir(parents=True, exist_ok=True)
+    df.to_pickle(STAGE_DIR / f"{name}.pkl")
+    return df
 
-    # === Extract & Transform ===
-    print("\n--- Loading and Transforming Source Data ---")
-    wiid = load_wiid_country()
-    print(f"[INFO] Loaded WIID data with {len(wiid)} records.")
-
-    ilos = {}
-    for file_key, fname in FILES["ILO"].items():
-        if file_key in ILO_MEASURE_MAP:
-            measure_name = ILO_MEASURE_MAP[file_key]
-            ilos[file_key] = load_ilostat_quick(fname, measure_name, dim_geography)
-            print(
-                f"[INFO] Loaded ILOSTAT '{fname}' "
-                f"({measure_name}) with {len(ilos[file_key])} records."
-            )
-
-    min_wage = load_ilostat_minimum_wage(
-        FILES["ILO"]["EAR_4MMN_CUR_NB_A"], "minimum_wage", dim_geography
-    )
-    print(f"[INFO] Loaded ILOSTAT Minimum Wage data with {len(min_wage)} records.")
 
-    wb_lit = load_worldbank_wide(
-        FILES["WB_LITERACY"], "literacy_rate", dim_geography
-    )
-    print(f"[INFO] Loaded World Bank Literacy data with {len(wb_lit)} records.")
+def _unstage(name: str) -> pd.DataFrame:
+    """Read back an intermediate DataFrame written by an earlier step."""
+    return pd.read_pickle(STAGE_DIR / f"{name}.pkl")
 
-    wb_pov = load_worldbank_wide(
+
+# Source loaders, keyed by the name each staged DataFrame is saved under.
+# Each takes the geography dimension (used by some loaders to harmonise countries).
+SOURCE_LOADERS = {
+    "WIID": lambda dim_geography: load_wiid_country(),
+    **{
+        f"ILO_{file_key}": (
+            lambda dim_geography, fname=fname, measure=ILO_MEASURE_MAP[file_key]:
+            load_ilostat_quick(fname, measure, dim_geography)
+        )
+        for file_key, fname in FILES["ILO"].items()
+        if file_key in ILO_MEASURE_MAP
+    },
+    "ILO_MIN_WAGE": lambda dim_geography: load_ilostat_minimum_wage(
+        FILES["ILO"]["EAR_4MMN_CUR_NB_A"], "minimum_wage", dim_geography
+    ),
+    "WB_LITERACY": lambda dim_geography: load_worldbank_wide(
+        FILES["WB_LITERACY"], "literacy_rate", dim_geography
+    ),
+    "WB_POVERTY": lambda dim_geography: load_worldbank_wide(
         FILES["WB_POVERTY"], "gini", dim_geography, indicator_name="Gini index"
-    )
-    print(f"[INFO] Loaded World Bank Poverty data with {len(wb_pov)} records.")
+    ),
+    "UNDP_HDI": load_hdi_csv,
+    "OWID_TOP10": lambda dim_geography: load_pip_top10(),
+    "OWID_TOP1": lambda dim_geography: load_pip_top1(),
+    "OWID_LIFE_EXPECTANCY": lambda dim_geography: load_owid_life_expectancy(),
+    "OWID_EDUCATION_INEQUALITY": lambda dim_geography: load_owid_education_inequality(),
+    "OWID_CALORIC_CV": lambda dim_geography: load_owid_caloric_cv(),
+    "OWID_GOV_SPEND": lambda dim_geography: load_gov_spend(),
+}
 
-    undp = load_hdi_csv(dim_geography)
-    print(f"[INFO] Loaded UNDP HDI data with {len(undp)} records.")
 
-    owid_top10 = load_pip_top10()
-    print(f"[INFO] Loaded OWID Top 10% Share data with {len(owid_top10)} records.")
+def reset_output_dir() -> None:
+    """Delete the previous run's outputs and recreate the output directory."""
+    if OUT_DIR.exists():
+        print(f"--- Deleting existing output directory: {OUT_DIR} ---")
+        time.sleep(2)  # Allow time for file locks to be released
+        shutil.rmtree(OUT_DIR)
+    OUT_DIR.mkdir(exist_ok=True)
 
-    owid_top1 = load_pip_top1()
-    print(f"[INFO] Loaded OWID Top 1% Share data with {len(owid_top1)} records.")
 
-    owid_life_expectancy = load_owid_life_expectancy()
-    print(
-        f"[INFO] Loaded OWID Life Expectancy data "
-        f"with {len(owid_life_expectancy)} records."
-    )
+def build_geography() -> None:
+    """Build Dim_Geography, the dimension every other step depends on."""
+    print("\n--- Building Geography Dimension ---")
+    _stage("DIM_GEOGRAPHY", build_dim_geography())
 
-    owid_education_inequality = load_owid_education_inequality()
-    print(
-        f"[INFO] Loaded OWID Education Inequality data "
-        f"with {len(owid_education_inequality)} records."
-    )
 
-    owid_caloric_cv = load_owid_caloric_cv()
-    print(f"[INFO] Loaded OWID Caloric CV data with {len(owid_caloric_cv)} records.")
+def extract_source(name: str) -> None:
+    """Load and transform one source dataset (see SOURCE_LOADERS)."""
+    df = SOURCE_LOADERS[name](_unstage("DIM_GEOGRAPHY"))
+    _stage(name, df)
+    print(f"[INFO] Loaded {name} data with {len(df)} records.")
 
-    owid_gov = load_gov_spend()
-    print(f"[INFO] Loaded OWID Government Spending data with {len(owid_gov)} records.")
 
-    # --- Build other dimensions from loaded / derived data ---
+def build_core_dimensions() -> None:
+    """Build the static and derived dimensions (gender, age, time, indicator, source, economic)."""
     print("\n--- Building Core Dimensions ---")
     dim_sex, dim_age = build_dim_sex_age()
-    dim_time = build_dim_time()
-    dim_indicator = build_dim_indicator()
+    _stage("DIM_SEX", dim_sex)
+    _stage("DIM_AGE", dim_age)
+    _stage("DIM_TIME", build_dim_time())
+    _stage("DIM_INDICATOR", build_dim_indicator())
 
     print("\n--- Building Additional Dimensions (Source, Econ) ---")
-    dim_source = build_dim_source()
-    dim_economic_classification = build_dim_economic_classification(dim_geography)
+    _stage("DIM_SOURCE", build_dim_source())
+    _stage(
+        "DIM_ECONOMIC_CLASSIFICATION",
+        build_dim_economic_classification(_unstage("DIM_GEOGRAPHY")),
+    )
+
+
+def build_facts_and_profile() -> None:
+    """Build and write the fact tables and the profiling report from the staged data."""
+    sources = {name: _unstage(name) for name in SOURCE_LOADERS}
+    ilos = {
+        file_key: sources[f"ILO_{file_key}"]
+        for file_key in FILES["ILO"]
+        if file_key in ILO_MEASURE_MAP
+    }
 
     # === Facts ===
     print("\n--- Building and Writing Fact Tables ---")
     profile_text = build_and_write_facts(
-        dim_geography=dim_geography,
-        dim_sex=dim_sex,
-        dim_age=dim_age,
-        dim_time=dim_time,
-        dim_indicator=dim_indicator,
-        dim_source=dim_source,
-        dim_economic_classification=dim_economic_classification,
-        wiid=wiid,
+        dim_geography=_unstage("DIM_GEOGRAPHY"),
+        dim_sex=_unstage("DIM_SEX"),
+        dim_age=_unstage("DIM_AGE"),
+        dim_time=_unstage("DIM_TIME"),
+        dim_indicator=_unstage("DIM_INDICATOR"),
+        dim_source=_unstage("DIM_SOURCE"),
+        dim_economic_classification=_unstage("DIM_ECONOMIC_CLASSIFICATION"),
+        wiid=sources["WIID"],
         ilos=ilos,
-        min_wage=min_wage,
-        wb_lit=wb_lit,
-        wb_pov=wb_pov,
-        undp=undp,
-        owid_top10=owid_top10,
-        owid_top1=owid_top1,
-        owid_life_expectancy=owid_life_expectancy,
-        owid_education_inequality=owid_education_inequality,
-        owid_caloric_cv=owid_caloric_cv,
-        owid_gov=owid_gov,
+        min_wage=sources["ILO_MIN_WAGE"],
+        wb_lit=sources["WB_LITERACY"],
+        wb_pov=sources["WB_POVERTY"],
+        undp=sources["UNDP_HDI"],
+        owid_top10=sources["OWID_TOP10"],
+        owid_top1=sources["OWID_TOP1"],
+        owid_life_expectancy=sources["OWID_LIFE_EXPECTANCY"],
+        owid_education_inequality=sources["OWID_EDUCATION_INEQUALITY"],
+        owid_caloric_cv=sources["OWID_CALORIC_CV"],
+        owid_gov=sources["OWID_GOV_SPEND"],
     )
 
     # === Quick profile file ===
     print("\n--- Generating Profiling Report ---")
     all_dfs = {
-        "WIID": wiid,
+        "WIID": sources["WIID"],
         **{f"ILO_{k}": v for k, v in ilos.items()},
-        "WB_Literacy": wb_lit,
-        "WB_Poverty": wb_pov,
-        "UNDP_HDI": undp,
-        "OWID_Top10": owid_top10,
-        "OWID_Top1": owid_top1,
-        "OWID_GovSpend": owid_gov,
+        "WB_Literacy": sources["WB_LITERACY"],
+        "WB_Poverty": sources["WB_POVERTY"],
+        "UNDP_HDI": sources["UNDP_HDI"],
+        "OWID_Top10": sources["OWID_TOP10"],
+        "OWID_Top1": sources["OWID_TOP1"],
+        "OWID_GovSpend": sources["OWID_GOV_SPEND"],
     }
     blocks = [profile_block(df, name) for name, df in all_dfs.items()]
     blocks.append("\n# Fact Table Profiles\n" + profile_text)
@@ -155,10 +171,33 @@ def main() -> None:
     Path(OUT["PROFILE"]).write_text("\n\n".join(blocks), encoding="utf-8")
     print(f"[INFO] Profiling report saved to {OUT['PROFILE']}")
 
+    shutil.rmtree(STAGE_DIR, ignore_errors=True)
+
+
+def main() -> None:
+    """Orchestrate the entire ETL process for the warehouse."""
+    print("--- Starting GWEILPDW ETL ---")
+
+    # === Cleanup ===
+    reset_output_dir()
+
+    # === Dimensions that depend only on raw data ===
+    build_geography()
+
+    # === Extract & Transform ===
+    print("\n--- Loading and Transforming Source Data ---")
+    for name in SOURCE_LOADERS:
+        extract_source(name)
+
+    # --- Build other dimensions from loaded / derived data ---
+    build_core_dimensions()
+
+    # === Facts and profile ===
+    build_facts_and_profile()
+
     print("\n--- ETL Process Completed Successfully ---")
     print(f"All outputs are in the '{OUT_DIR.resolve()}' directory.")
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,7 +1,9 @@
+import os
 import re
 import pandas as pd
-from typing import List
-from config import EXCLUDE_ISO3
+from pathlib import Path
+from typing import Callable, List
+from config import CACHE_DIR, EXCLUDE_ISO3
 
 
 ISO_ALIASES = {
@@ -30,6 +32,46 @@ def to_numeric_series(s: pd.Series) -> pd.Series:
     )
 
 
+def read_excel_sheets(path, usecols=None) -> pd.DataFrame:
+    """Read every sheet of a workbook in a single parse and stack them into one frame.
+
+    usecols, if given, is a set of column names matched case- and whitespace-insensitively;
+    only those columns are materialized.
+    """
+    if usecols is not None:
+        wanted = {c.strip().lower() for c in usecols}
+        usecols = lambda c: str(c).strip().lower() in wanted
+    try:
+        sheets = pd.read_excel(path, sheet_name=None, engine="calamine", usecols=usecols)
+    except (ImportError, ValueError):  # python-calamine not installed, or pandas < 2.2
+        sheets = pd.read_excel(path, sheet_name=None, usecols=usecols)
+    return pd.concat(sheets.values(), ignore_index=True)
+
+
+def write_parquet_cache(df: pd.DataFrame, cache: Path) -> None:
+    """Write df to cache via a temporary file, so a crash never leaves a partial cache; skip on failure."""
+    tmp = cache.with_name(cache.name + ".tmp")
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, cache)
+    except (OSError, ValueError, TypeError):  # mixed-type columns Arrow cannot store, or read-only disk
+        tmp.unlink(missing_ok=True)
+
+
+def read_cached(source: Path, name: str, load: Callable[[Path], pd.DataFrame]) -> pd.DataFrame:
+    """Return load(source), cached as CACHE_DIR/<name>.parquet and reused while newer than source.
+
+    name must change whenever load changes what it returns (e.g. its column selection).
+    """
+    cache = CACHE_DIR / f"{name}.parquet"
+    if cache.exists() and cache.stat().st_mtime >= source.stat().st_mtime:
+        return pd.read_parquet(cache)
+    df = load(source)
+    write_parquet_cache(df, cache)
+    return df
+
+
 def exclude_israel(df: pd.DataFrame, iso_col: str = "iso3") -> pd.DataFrame:
     """Exclude rows where iso_col is in the configured EXCLUDE_ISO3 set."""
     s = df.get(iso_col, pd.Series(index=df.index, dtype=object))